@@ -43,6 +43,12 @@ from mathutils import Color, Vector, Matrix, Quaternion, Euler
 
 import math
 
+import time
+
+import hashlib
+
+import numpy as np
+
 try:
     import dairin0d
     dairin0d_location = ""
@@ -51,16 +57,24 @@ except ImportError:
 
 exec("""
 from {0}dairin0d.utils_view3d import SmartView3D
-from {0}dairin0d.utils_blender import MeshBaker, BlUtil
+from {0}dairin0d.utils_blender import MeshBaker, ObjectRevisions, BlUtil
 from {0}dairin0d.utils_math import clamp_angle
+from {0}dairin0d.utils_curve import ArcLengthTable, matrix_scale_factor, minimal_twist
+from {0}dairin0d.utils_meshio import PlyWriter, ObjWriter
+from {0}dairin0d.utils_python import setattr_cmp
 from {0}dairin0d.utils_userinput import KeyMapUtils
 from {0}dairin0d.utils_ui import NestedLayout, find_ui_area, ui_context_under_coord
+from {0}dairin0d.utils_gl import cgl
 from {0}dairin0d.bpy_inspect import prop, BlRna
 from {0}dairin0d.utils_addon import AddonManager
 """.format(dairin0d_location))
 
 addon = AddonManager()
 
+# Mesh caches reuse conversions until objects change (registered first,
+# so that revisions are up to date in the addon's scene_update_post)
+ObjectRevisions.track(addon)
+
 #============================================================================#
 
 """
@@ -80,8 +94,8 @@ cable editor:
   custom wire profile
   option to specify profile/width/height/rotation of individual wires
   multi-row bus cable
-  "filled-in" braided cable? (many wires of small size, not just on the outer radius, but everywhere inside)
-  multiple layers of wires
++ "filled-in" braided cable? (many wires of small size, not just on the outer radius, but everywhere inside)
++ multiple layers of wires
 + implement fix for scaling wires
   moth3r asks to implement presets system
   moth3r asks for procedural custom curve profiles
@@ -120,6 +134,415 @@ https://vimeo.com/35145361
 bevel_factor_mapping_exists = ("bevel_factor_mapping_start" in BlRna(bpy.types.Curve).properties)
 bevel_factor_mapping_exists &= ("bevel_factor_mapping_end" in BlRna(bpy.types.Curve).properties)
 
+# Python-side cache of arc-length tables: cable name -> (pointer, table).
+# Tables detect changed points by themselves; entries of other objects
+# (different pointer) are replaced, and entries of deleted objects are pruned.
+length_tables = {}
+
+def length_tables_prune():
+    objects = bpy.data.objects
+    for name in tuple(length_tables.keys()):
+        obj = objects.get(name)
+        if (not obj) or (obj.users == 0): del length_tables[name]
+
+@addon.load_post
+def load_post():
+    length_tables.clear()
+    child_index.clear()
+    wire_profile_cache.clear()
+    proxy_polylines.clear()
+    proxy_state["view_matrices"].clear()
+
+# Viewport navigation detection for the 'AUTO' proxy mode: view matrices
+# are compared in a draw callback, and proxies are switched on/off in
+# scene_update_post (scene data shouldn't be modified while drawing)
+proxy_state = dict(navigating=False, view_change_time=0.0, view_matrices={})
+proxy_delay = 0.5 # seconds after the last view change
+proxy_polylines = {}
+
+@addon.view3d_draw('POST_VIEW')
+def draw_cable_proxies():
+    context = bpy.context
+    rv3d = context.region_data
+    if not rv3d: return
+    
+    key = rv3d.as_pointer()
+    view_matrix = tuple(tuple(row) for row in rv3d.perspective_matrix)
+    view_matrices = proxy_state["view_matrices"]
+    if view_matrices.get(key, view_matrix) != view_matrix:
+        proxy_state["view_change_time"] = time.perf_counter()
+    view_matrices[key] = view_matrix
+    
+    cables = [obj for obj in context.visible_objects if (obj.type == 'CURVE') and obj.cable_settings.proxy_active]
+    if not cables: return
+    
+    with cgl('Color', 'LineWidth', DEPTH_TEST=True):
+        for obj in cables:
+            points = obj.cable_settings.proxy_polyline()
+            if not points: continue
+            cgl.Color = ((1.0, 0.6, 0.2, 1.0) if obj.select else (0.1, 0.1, 0.1, 1.0))
+            cgl.LineWidth = (3 if obj.select else 2)
+            with cgl.batch('LINE_STRIP') as batch:
+                batch.sequence(points)
+
+def update_cable_proxies(scene):
+    navigating = (time.perf_counter() - proxy_state["view_change_time"]) < proxy_delay
+    if navigating == proxy_state["navigating"]: return
+    proxy_state["navigating"] = navigating
+    for obj in iter_cables(scene):
+        cable_settings = obj.cable_settings
+        if cable_settings.proxy_mode == 'AUTO': cable_settings.proxy_update(navigating)
+
+# Level of detail
+lod_hysteresis = 0.25 # in levels (on top of the 0.5 rounding threshold)
+lod_state = dict(view_change_time=None, camera_key=None)
+
+def lod_views(scene, viewport=True):
+    # (world-to-view matrix, width in pixels, projection_info) of the 3D views
+    # and the scene camera; view-space z is the depth
+    viewport_views = []
+    if viewport:
+        for window in bpy.context.window_manager.windows:
+            for sv3d in SmartView3D.find_in_ui(window):
+                m = np.array(sv3d.region_data.view_matrix)
+                m[2] *= -1
+                viewport_views.append((m, sv3d.region.width, sv3d.projection_info))
+    
+    render_views = []
+    camera = scene.camera
+    if camera and (camera.type == 'CAMERA'):
+        render = scene.render
+        m = np.array(camera.matrix_world.normalized().inverted())
+        m[2] *= -1
+        width = render.resolution_x * render.resolution_percentage * 0.01
+        render_views.append((m, width, BlUtil.Camera.projection_info(camera.data, scene)))
+    
+    return viewport_views, render_views
+
+def lod_pixel_scale(view, corners):
+    "Pixels per world unit at the nearest of the corners"
+    m, width, (size, offset) = view
+    extent = size.x
+    if size.z != 0: # perspective
+        depth = (corners.dot(m[2, :3]) + m[2, 3]).min()
+        if depth <= 1e-6: return math.inf # intersects the view plane
+        extent *= depth / offset.z
+    return width / max(extent, 1e-12)
+
+def lod_choose_level(pixels, lod_size, max_level, level):
+    level = min(level, max_level)
+    if pixels <= 0: return max_level
+    target = (math.log2(lod_size / pixels) if pixels < lod_size else 0.0)
+    target = min(target, max_level)
+    if abs(target - level) <= 0.5 + lod_hysteresis: return level
+    return int(round(target))
+
+def lod_camera_key(scene):
+    camera = scene.camera
+    render = scene.render
+    render_key = (render.resolution_x, render.resolution_y, render.resolution_percentage,
+        render.pixel_aspect_x, render.pixel_aspect_y)
+    if not camera: return (None, render_key)
+    return (camera.as_pointer(), tuple(tuple(row) for row in camera.matrix_world), render_key)
+
+def update_cable_lods(scene, is_updated):
+    # Called from scene_update_post, so render levels (scene camera) are
+    # also applied on the main thread, before a render is started
+    if proxy_state["navigating"]: return # wait until the view stops changing
+    
+    view_change_time = proxy_state["view_change_time"]
+    camera_key = lod_camera_key(scene)
+    camera = scene.camera
+    views_changed = (lod_state["view_change_time"] != view_change_time) or (lod_state["camera_key"] != camera_key)
+    views_changed |= bool(camera and camera.is_updated_data) # e.g. lens
+    if not (views_changed or is_updated): return
+    lod_state["view_change_time"] = view_change_time
+    lod_state["camera_key"] = camera_key
+    
+    cables = [obj for obj in iter_cables(scene) if obj.cable_settings.lod_enabled]
+    if not views_changed: # only the cables that have changed
+        cables = [obj for obj in cables if obj.is_updated or obj.is_updated_data]
+    if not cables: return
+    
+    viewport_views, render_views = lod_views(scene)
+    with SceneUpdateBatch():
+        for obj in cables:
+            obj.cable_settings.lod_update(viewport_views, render_views)
+
+class SceneUpdateBatch:
+    "Defers scene updates (e.g. after adding children) until the outermost batch ends"
+    depth = 0
+    pending = False
+    
+    def __enter__(self):
+        SceneUpdateBatch.depth += 1
+        return self
+    
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        SceneUpdateBatch.depth -= 1
+        if SceneUpdateBatch.depth == 0: self.flush()
+    
+    @classmethod
+    def flush(cls):
+        if not cls.pending: return
+        cls.pending = False
+        bpy.context.scene.update()
+    
+    @classmethod
+    def scene_update(cls):
+        if cls.depth > 0:
+            cls.pending = True
+        else:
+            bpy.context.scene.update()
+
+def braided_wire_layout(n, outer_radius, wire_twisting, wire_offset=0.0, align=True, tolerance=1e-9, max_iterations=64):
+    """
+    Finds the radius of braided wires that stick to the outer radius
+    when twisted (fixed-point iteration until the radius changes less
+    than tolerance). n can be an array of wire counts.
+    Returns (wire_radius, r_offset, twist_direction_angle, angle_offset).
+    """
+    n = np.maximum(np.asarray(n, dtype=np.float64), 1.0)
+    h = outer_radius
+    
+    angle_offset = np.where(n > 1, (math.pi*2) / n, 0.0)
+    
+    # 1 wire: whole radius; 2 wires: half radius;
+    # otherwise: incircle of an isosceles triangle
+    # http://mathworld.wolfram.com/Inradius.html
+    if h > 0:
+        a = 2 * h * np.tan(np.where(n > 2, angle_offset, 0.0) / 2)
+        incircle_radius = (np.sqrt(a*a + 4*h*h) - a) * (a / (4*h))
+    else:
+        incircle_radius = np.zeros_like(n)
+    base_radius = np.where(n == 1, h, np.where(n == 2, h / 2, incircle_radius))
+    base_offset = h - base_radius
+    
+    use_twisting = align and (abs(wire_twisting) > 1e-6)
+    one_wire_offset = (((math.pi*2) / wire_twisting) / n if use_twisting else np.zeros_like(n))
+    
+    wire_radius = base_radius
+    for i in range(max_iterations):
+        r_offset = base_offset + wire_offset
+        twist_direction_angle = (-np.arctan(wire_twisting * r_offset) if align else np.zeros_like(n))
+        
+        if not use_twisting: break
+        
+        # Distance between neighboring wires (measured perpendicular
+        # to the twisting direction), in closed form
+        twist_abs = np.abs(twist_direction_angle)
+        cos_t, sin_t = np.cos(twist_abs), np.sin(twist_abs)
+        delta_arc_W = (sin_t * cos_t * one_wire_offset) / np.where(r_offset != 0, r_offset, 1.0)
+        delta_z = one_wire_offset * sin_t * sin_t
+        distance = np.sqrt((2 * r_offset * np.sin(delta_arc_W / 2))**2 + delta_z**2)
+        
+        is_twisted = (twist_abs > 0)
+        new_radius = np.where(is_twisted, np.minimum(base_radius, distance * 0.5), base_radius)
+        base_offset = np.where(is_twisted, h - new_radius, base_offset)
+        
+        converged = (i > 0) and (np.max(np.abs(new_radius - wire_radius)) <= tolerance)
+        wire_radius = new_radius
+        if converged: break
+    
+    return (wire_radius, r_offset, twist_direction_angle, angle_offset)
+
+def _ring_capacity(rho, radius):
+    # How many circles of the given radius fit on a ring of radius rho
+    if rho < radius: return (1 if rho >= 0 else 0)
+    return max(int(math.pi / math.asin(min(radius / rho, 1.0)) + 1e-9), 1)
+
+def _layer_rings(outer_radius, radius):
+    # Rings from the outside in (ring center radius, capacity)
+    rings = []
+    rho = outer_radius - radius
+    while rho >= -1e-12:
+        capacity = _ring_capacity(max(rho, 0.0), radius)
+        rings.append((max(rho, 0.0), capacity))
+        if rho < radius: break
+        rho -= radius * 2
+    return rings
+
+def _hex_lattice(outer_radius, radius):
+    # Centers of a hexagonal packing (grid with 2*radius spacing) inside the outer radius
+    limit = outer_radius - radius
+    if limit < 0: return np.zeros((0, 2))
+    dy = radius * math.sqrt(3.0)
+    nx = int(limit / (radius * 2)) + 1
+    ny = int(limit / dy) + 1
+    ix, iy = np.meshgrid(np.arange(-nx, nx+1), np.arange(-ny, ny+1))
+    x = (ix + (iy % 2) * 0.5) * (radius * 2)
+    y = iy * dy
+    co = np.column_stack((x.ravel(), y.ravel()))
+    return co[np.einsum("ij,ij->i", co, co) <= (limit * limit + 1e-12)]
+
+def _largest_radius(n, outer_radius, capacity, iterations=48):
+    # Binary search for the largest radius at which n circles still fit
+    r_min, r_max = 0.0, outer_radius
+    if capacity(r_max) >= n: return r_max
+    r_min = outer_radius / (math.sqrt(n) * 2 + 2) # hexagonal packing bound
+    while (capacity(r_min) < n) and (r_min > 1e-12): r_min *= 0.5
+    for i in range(iterations):
+        r = (r_min + r_max) * 0.5
+        if capacity(r) >= n:
+            r_min = r
+        else:
+            r_max = r
+    return r_min
+
+def pack_circles(n, outer_radius, layout='LAYERS'):
+    """
+    Packs n equal circles into a circle of the given outer radius,
+    either as concentric layers ('LAYERS') or as a hexagonal lattice
+    ('FILLED'). Returns (radius, rho, theta, layer), where rho/theta are
+    the polar coordinates of circle centers (theta=0 is +Y) and layer
+    is the ring index counted from the outside.
+    """
+    if (n <= 0) or (outer_radius <= 0):
+        return (0.0, np.zeros(n), np.zeros(n), np.zeros(n, dtype=np.int32))
+    
+    if layout == 'FILLED':
+        radius = _largest_radius(n, outer_radius, (lambda r: len(_hex_lattice(outer_radius, r))))
+        co = _hex_lattice(outer_radius, radius)
+        distances = np.sqrt(np.einsum("ij,ij->i", co, co))
+        if len(co) > n:
+            # Keep the n outermost ones (circles stick to the outer radius)
+            indices = np.argpartition(-distances, n-1)[:n]
+            co, distances = co[indices], distances[indices]
+        rho = distances
+        theta = np.arctan2(-co[:, 0], co[:, 1])
+        layer = np.floor((outer_radius - radius - rho) / (radius * math.sqrt(3.0)) + 0.5).astype(np.int32)
+    else:
+        capacity = (lambda r: sum(ring_capacity for ring_rho, ring_capacity in _layer_rings(outer_radius, r)))
+        radius = _largest_radius(n, outer_radius, capacity)
+        rho, theta, layer = [], [], []
+        remaining = n
+        for i, (ring_rho, ring_capacity) in enumerate(_layer_rings(outer_radius, radius)):
+            count = min(ring_capacity, remaining)
+            rho.append(np.full(count, ring_rho))
+            theta.append(np.arange(count) * ((math.pi * 2) / count))
+            layer.append(np.full(count, i, dtype=np.int32))
+            remaining -= count
+            if remaining <= 0: break
+        rho, theta, layer = np.concatenate(rho), np.concatenate(theta), np.concatenate(layer)
+    
+    return (radius, rho, theta, layer)
+
+# Memoized results of braided_wire_layout() and pack_circles()
+wire_layout_cache = {}
+
+def wire_layout_cached(key, calculate):
+    result = wire_layout_cache.get(key)
+    if result is None:
+        if len(wire_layout_cache) >= 1024: wire_layout_cache.clear()
+        result = calculate()
+        wire_layout_cache[key] = result
+    return result
+
+def braided_wire_layout_cached(n, outer_radius, wire_twisting, wire_offset=0.0, align=True):
+    return wire_layout_cached(('RING', n, outer_radius, wire_twisting, wire_offset, align),
+        (lambda: tuple(float(v) for v in braided_wire_layout(n, outer_radius, wire_twisting, wire_offset, align))))
+
+def pack_circles_cached(n, outer_radius, layout):
+    return wire_layout_cached((layout, n, outer_radius), (lambda: pack_circles(n, outer_radius, layout)))
+
+class WireProfileCache:
+    """
+    Content-addressed cache of wire profile meshes: cables with identical
+    profiles share one mesh (materials are assigned via object-linked
+    slots). Meshes are reference-counted by Blender (mesh.users), and
+    unused ones are evicted when released.
+    """
+    key_prop = "cable_wire_profile"
+    
+    def __init__(self):
+        self.names = {} # key -> mesh name
+        self.state = None # bpy.data pointer the index was built for
+    
+    def clear(self):
+        self.names.clear()
+        self.state = None
+    
+    def _reindex(self):
+        # Only needed when meshes could have been loaded or restored
+        # (file load/undo change the bpy.data pointer)
+        state = bpy.data.as_pointer()
+        if self.state == state: return
+        self.state = state
+        self.names.clear()
+        for mesh in bpy.data.meshes:
+            key = mesh.get(self.key_prop)
+            if key: self.names[key] = mesh.name
+    
+    def _lookup(self, key):
+        name = self.names.get(key)
+        mesh = (bpy.data.meshes.get(name) if name else None)
+        if mesh and (mesh.get(self.key_prop) == key): return mesh
+        return None
+    
+    def get(self, key, build):
+        self._reindex()
+        mesh = self._lookup(key)
+        if not mesh: # e.g. a new profile (or a renamed mesh)
+            mesh = bpy.data.meshes.new("WIRES")
+            mesh[self.key_prop] = key
+            build(mesh)
+            self.names[key] = mesh.name
+        return mesh
+    
+    def release(self, mesh):
+        if (not mesh) or (mesh.users > 0): return
+        key = mesh.get(self.key_prop)
+        if key: self.names.pop(key, None)
+        bpy.data.meshes.remove(mesh)
+    
+    def evict(self):
+        for mesh in tuple(bpy.data.meshes):
+            if mesh.get(self.key_prop) and (mesh.users == 0):
+                self.release(mesh)
+
+wire_profile_cache = WireProfileCache()
+
+# Index of children by parent pointer and tag. obj.children is an
+# O(number of objects) query, so the result is kept until objects are
+# added/removed/updated or the undo/file state changes (bpy.data pointer).
+child_index = {}
+child_index_state = [None]
+
+def child_index_check():
+    state = (bpy.data.as_pointer(), len(bpy.data.objects))
+    if child_index_state[0] != state:
+        child_index.clear()
+        child_index_state[0] = state
+
+def child_index_invalidate(obj=None):
+    if obj is None:
+        child_index.clear()
+    else:
+        child_index.pop(obj.as_pointer(), None)
+
+def child_index_get(obj):
+    child_index_check()
+    key = obj.as_pointer()
+    tags = child_index.get(key)
+    if tags is None:
+        tags = {}
+        for child in obj.children:
+            tag = child.cable_settings.tag
+            tags[tag] = tags.get(tag, ()) + (child,)
+        child_index[key] = tags
+    return tags
+
+def child_index_children(obj, tag=None):
+    tags = child_index_get(obj)
+    children = (tags.get(tag, ()) if tag is not None else sum(tags.values(), ()))
+    try:
+        is_valid = all(((child.parent == obj) and ((tag is None) or (child.cable_settings.tag == tag))) for child in children)
+    except ReferenceError:
+        is_valid = False
+    if is_valid: return children
+    child_index_invalidate(obj)
+    return child_index_children(obj, tag)
+
 @addon.Panel
 class DATA_PT_curve_cable:
     bl_space_type = 'PROPERTIES'
@@ -156,6 +579,10 @@ class DATA_PT_curve_cable:
             layout.operator("object.select_whole_subheirarchy", text="Select whole")
             layout.operator("object.cable_unselect_children", text="Unselect")
             layout.operator("object.cable_to_mesh", text="To mesh")
+            layout.operator("object.cables_to_mesh", text="Batch to mesh")
+            layout.operator("object.cables_export", text="Export")
+            layout.prop(cable_settings, "driver_mode", text="")
+            layout.prop(cable_settings, "proxy_mode", text="")
         
         with layout.split(0.15):
             layout.label(text="Subdivs:")
@@ -163,10 +590,24 @@ class DATA_PT_curve_cable:
                 with layout.row(True):
                     icon = ('RESTRICT_VIEW_ON' if cable_settings.is_wireframe else 'RESTRICT_VIEW_OFF')
                     layout.prop(cable_settings, "is_wireframe", icon=icon, text="", toggle=True)
-                    layout.prop(curve, "resolution_u", text="Preview")
+                    if cable_settings.lod_enabled:
+                        layout.prop(cable_settings, "lod_resolution_u", text="Preview")
+                    else:
+                        layout.prop(curve, "resolution_u", text="Preview")
                 with layout.row(True):
                     layout.prop(obj, "hide_render", icon='RESTRICT_RENDER_OFF', text="", toggle=True)
-                    layout.prop(curve, "render_resolution_u", text="Render")
+                    if cable_settings.lod_enabled:
+                        layout.prop(cable_settings, "lod_render_resolution_u", text="Render")
+                    else:
+                        layout.prop(curve, "render_resolution_u", text="Render")
+        
+        with layout.split(0.15):
+            layout.label(text="LOD:")
+            with layout.row(True):
+                layout.prop(cable_settings, "lod_enabled", text="")
+                with layout.row(True)(active=cable_settings.lod_enabled):
+                    layout.prop(cable_settings, "lod_size", text="Size")
+                    layout.prop(cable_settings, "lod_max_level", text="Levels")
         
         with layout.split(0.15):
             layout.label(text="Deform:")
@@ -237,6 +678,7 @@ class DATA_PT_curve_cable:
                 layout.prop(cable_settings, "wire_count", text="Wires")
                 layout.prop(cable_settings, "wire_type", text="")
                 with layout.row(True)(active=cable_settings.wire_is_braided):
+                    layout.prop(cable_settings, "wire_layout", text="")
                     layout.prop(cable_settings, "wire_twisting", text="Twisting")
                     layout.prop(cable_settings, "wire_twisting_align", text="Align", toggle=True)
                 icon = ('RESTRICT_SELECT_ON' if cable_settings.wire_hide_select else 'RESTRICT_SELECT_OFF')
@@ -258,7 +700,7 @@ class DATA_PT_curve_cable:
             else:
                 with layout.row(True):
                     for i, material_slot in enumerate(wire_material_slots):
-                        if i >= cable_settings.wire_count: break
+                        if i >= cable_settings.wire_material_count: break
                         layout.prop(material_slot, "material", text="", icon_only=True)
         
         with layout.box():
@@ -335,7 +777,7 @@ class CableSettingsPG:
         def walk_children(parent):
             if (not tags) or (parent.cable_settings.tag in tags):
                 cable_objects.append(parent)
-            for child in parent.children:
+            for child in child_index_children(parent):
                 walk_children(child)
         
         walk_children(encapsulator)
@@ -370,7 +812,7 @@ class CableSettingsPG:
                     for v3d in v3ds:
                         base.layers_from_view(v3d)
             
-            for child in parent.children:
+            for child in child_index_children(parent):
                 walk_children(child, layers, layers_local_view)
         
         walk_children(encapsulator, tuple(obj.layers), tuple(obj.layers_local_view))
@@ -438,6 +880,10 @@ class CableSettingsPG:
             bm.free()
         return mesh
     
+    def batch(self):
+        # with cable_settings.batch(): ... -- one scene update at the end
+        return SceneUpdateBatch()
+    
     # Direct parenting is needed to keep things encapsulated.
     # ATTENTION: when parenting to curve, BLENDER ALWAYS MOVES
     # CURVE'S CHILDREN WITH THE FIRST POINT OF FIRST SPLINE.
@@ -445,8 +891,8 @@ class CableSettingsPG:
     # so we have to use CopyLocation/CopyTransforms constraint
     # (which seems to override direct parent).
     def _get_child(self, obj, tag, create=False, data=None, visible=True, constraint=None):
-        for child in obj.children:
-            if child.cable_settings.tag == tag: return child
+        for child in child_index_children(obj, tag):
+            return child
         if not create: return None
         init = (create if not isinstance(create, bool) else None)
         return self._add_child(obj, tag, init, data, visible, constraint)
@@ -465,6 +911,7 @@ class CableSettingsPG:
                 data = self._get_degenerate_mesh(True, "<Select a mesh>")
         child = bpy.data.objects.new(tag, data)
         bpy.context.scene.objects.link(child)
+        child.layers = obj.layers # otherwise it's on the scene's active layers
         
         child.cable_settings.tag = tag
         
@@ -480,15 +927,18 @@ class CableSettingsPG:
         
         if init: init(child)
         
-        bpy.context.scene.update()
+        child_index_invalidate(obj)
+        
+        SceneUpdateBatch.scene_update()
         
         return child
     
     def _iter_children(self, obj, tag):
-        for child in obj.children:
-            if child.cable_settings.tag == tag: yield child
+        for child in child_index_children(obj, tag):
+            yield child
     
     def _delete_child(self, child):
+        child_index_invalidate()
         try:
             bpy.context.scene.objects.unlink(child)
             bpy.data.objects.remove(child)
@@ -520,11 +970,17 @@ class CableSettingsPG:
     
     def _cable_child_set_visibility(self, child, visible):
         if not child: return
-        child.hide = (not visible)
+        self._cable_child_set_hide(child, (not visible))
         #child.hide_select = (not visible)
         #child.hide_select = True
         child.hide_render = (not visible)
     
+    def _cable_child_set_hide(self, child, hide):
+        # While the proxy is displayed, "visible" children stay hidden
+        proxied = (not hide) and (child.cable_settings.tag in self.tags_visible) and self._get_main_cable_settings().proxy_active
+        child.hide = hide or proxied
+        child.cable_settings.proxy_hidden = proxied
+    
     def _get_driver_fcurve(self, obj, data_path, index=-1, create=False):
         if obj.animation_data:
             for fcurve in obj.animation_data.drivers:
@@ -620,56 +1076,84 @@ class CableSettingsPG:
         return self
     
     # Length-calculation methods and properties
-    def _length_calculator_init(self, length_calc):
-        obj = self.id_data
-        #encapsulator = length_calc.parent
-        md_array = self._get_modifier(length_calc, 'ARRAY', True)
-        md_array.fit_type = 'FIT_CURVE'
-        md_array.curve = obj
-        md_array.use_constant_offset = True
-        # Even if source mesh is empty, Blender doesn't skip
-        # the array calculations, so we can't use arbitrary precision
-        # 0.0025 is not too slow on my computer for 400-meter curve
-        md_array.constant_offset_displace = Vector((0, 0, 0.0025))
-        md_array.use_relative_offset = False
-        md_array.use_object_offset = False
-        md_array.use_merge_vertices = False
-        #md_array.start_cap = encapsulator
-        #md_array.end_cap = encapsulator
-        length_calc.scale = Vector((0,0,0))
-    
-    # This method is called (indirectly) from attachments too
-    # Used by calculate_length, _init_length_driver
-    def _length_calculator_get(self, create=False):
-        self = self._get_main_cable_settings()
-        if create: create = self._length_calculator_init
-        # We cannot use absolutely empty mesh, because in this case
-        # Blender will print warnings in the console on each object update
-        return self._cable_child_get("LENGTH_CALC", create=create, data='MESH:1', visible=False)
+    # Length is calculated analytically from the spline's control points
+    # (previously, a hidden LENGTH_CALC object with a FIT_CURVE Array
+    # modifier was used for that, which was slow for long curves).
+    # The value is in the same "units" as the one used by the modifiers
+    # (i.e. multiplied by the curve object's scale), and is stored in
+    # the "length" property so that drivers can read it.
+    length = 0.0 | prop("Curve length (updated automatically)", "Length", subtype='DISTANCE', unit='LENGTH', precision=3)
     
-    length_calc_prop = "bound_box[1][2]"
-    length_calc_value = (lambda self, length_calc: length_calc.bound_box[1][2])
+    length_calc_prop = "cable_settings.length"
     
-    def calculate_length(self, create=False):
-        obj, curve = self.get_obj_curve()
-        if not curve: return 0.0
-        encapsulator = self._get_child(obj, "CABLE_EXTRAS")
-        delete_afterwards = (not encapsulator) and (not create)
-        length_calc = self._length_calculator_get(True)
-        value = self.length_calc_value(length_calc)
-        if delete_afterwards:
+    def length_table(self):
+        self = self._get_main_cable_settings()
+        obj = self.id_data
+        spline = self.get_spline()
+        if not spline: return None
+        pointer, table = length_tables.get(obj.name, (None, None))
+        if (table is None) or (pointer != obj.as_pointer()):
+            table = ArcLengthTable()
+            length_tables[obj.name] = (obj.as_pointer(), table)
+        table.update(spline)
+        return table
+    
+    @property
+    def length_scale(self):
+        self = self._get_main_cable_settings()
+        return matrix_scale_factor(self.id_data.matrix_world)
+    
+    def calculate_length(self):
+        # Length of the path that Curve/FollowPath/Array actually follow
+        # (polyline at the curve's resolution, not the exact arc length);
+        # the analytic table is used for parametrization (locate_length etc.)
+        table = self.length_table()
+        if not table: return 0.0
+        obj, curve = self._get_main_cable_settings().get_obj_curve()
+        return table.path_length(curve.resolution_u) * self.length_scale
+    
+    def length_at(self, segments, t):
+        # Length (in modifier units) at the given segment/parameter pairs
+        table = self.length_table()
+        if not table: return None
+        scalar = (np.ndim(segments) == 0) and (np.ndim(t) == 0)
+        lengths = table.length_at(np.atleast_1d(segments), np.atleast_1d(t)) * self.length_scale
+        return (float(lengths[0]) if scalar else lengths)
+    
+    def locate_length(self, lengths):
+        # Inverse of length_at(): length(s) in modifier units -> (segments, t)
+        table = self.length_table()
+        if not table: return None
+        scale = self.length_scale
+        return table.locate(np.asarray(lengths, dtype=np.float64) / max(scale, 1e-12))
+    
+    def length_at_points(self):
+        table = self.length_table()
+        if not table: return None
+        return table.length_at_points() * self.length_scale
+    
+    def update_length(self):
+        self = self._get_main_cable_settings()
+        return setattr_cmp(self, "length", self.calculate_length(), 1e-6)
+    
+    def _upgrade_legacy_length_calculator(self):
+        length_calc = self._cable_child_get("LENGTH_CALC")
+        if not length_calc: return
+        # Re-target the drivers before the old calculator is deleted
+        with self.batch():
+            self.wire_update(force=True)
+            self.attachment_update_all(force=True)
             self._cable_child_delete(length_calc)
-            self._cable_child_delete(encapsulator)
-        return value
     
     def _init_length_driver(self, fcurve):
-        id_obj = self._length_calculator_get(True)
+        id_obj = self._get_main_cable_settings().id_data
         data_path = self.length_calc_prop
         self._init_driver_single_prop(fcurve, id_obj, data_path)
     
     def _set_length_driver(self, obj, data_path, index, coefficients, inverse=False):
         fcurve = self._get_driver_fcurve(obj, data_path, index, create=self._init_length_driver)
-        self._update_driver_single_prop(fcurve, coefficients, data_path=self.length_calc_prop,
+        id_obj = self._get_main_cable_settings().id_data
+        self._update_driver_single_prop(fcurve, coefficients, id_obj=id_obj, data_path=self.length_calc_prop,
             expression=("1.0/max({}, 1e-6)" if inverse else "{}").format("var"), var_name="var")
     
     def _init_scale_driver(self, fcurve):
@@ -692,18 +1176,186 @@ class CableSettingsPG:
     def _init_length_scale_driver(self, fcurve):
         main_self = self._get_main_cable_settings()
         encapsulator = main_self._get_child(main_self.id_data, "CABLE_EXTRAS")
-        length_calc = main_self._length_calculator_get(True)
         
         self._init_driver_single_prop(fcurve)
-        self._update_driver_single_prop(fcurve, var_id=0, var_name="L", id_obj=length_calc, data_path=self.length_calc_prop)
+        self._update_driver_single_prop(fcurve, var_id=0, var_name="L", id_obj=main_self.id_data, data_path=self.length_calc_prop)
         self._update_driver_single_prop(fcurve, var_id=1, var_name="SX", id_obj=encapsulator, data_path="dimensions.x")
         self._update_driver_single_prop(fcurve, var_id=2, var_name="SY", id_obj=encapsulator, data_path="dimensions.y")
         self._update_driver_single_prop(fcurve, var_id=3, var_name="SZ", id_obj=encapsulator, data_path="dimensions.z")
     
     def _set_length_scale_driver(self, obj, data_path, index, expresion, coefficients):
         fcurve = self._get_driver_fcurve(obj, data_path, index, create=self._init_length_scale_driver)
+        main_self = self._get_main_cable_settings()
+        self._update_driver_single_prop(fcurve, var_id=0, id_obj=main_self.id_data, data_path=self.length_calc_prop)
         self._update_driver_single_prop(fcurve, coefficients, expression=expresion)
     
+    # In 'DIRECT' mode, the length-dependent values are calculated by the
+    # addon itself (when the cable changes) and written as plain values,
+    # instead of being evaluated by Blender's Python drivers on each update.
+    def on_driver_mode_changed(self, context):
+        self = self._get_main_cable_settings()
+        with self.batch():
+            self.wire_update()
+            self.attachment_update_all()
+    
+    driver_mode = 'DRIVERS' | prop("How length-dependent values are updated", "Driver mode", update=on_driver_mode_changed, items=[
+        ('DRIVERS', "Drivers", "Use scripted drivers (evaluated by Blender on each update)"),
+        ('DIRECT', "Direct", "Calculate values when the cable changes and write them directly (faster for many cables)"),
+    ])
+    
+    length_scale_expression = "L * sqrt(3.0 / (SX*SX + SY*SY + SZ*SZ))"
+    
+    @property
+    def use_direct_values(self):
+        return (self._get_main_cable_settings().driver_mode == 'DIRECT')
+    
+    def _remove_driver_fcurve(self, obj, data_path, index=-1):
+        if not self._get_driver_fcurve(obj, data_path, index): return
+        obj.driver_remove(data_path, index)
+    
+    def _set_driven_value(self, obj, data_path, index, coefficients, x):
+        self._remove_driver_fcurve(obj, data_path, index)
+        
+        value = sum(c * (x ** i) for i, c in enumerate(coefficients))
+        
+        if "." in data_path:
+            owner_path, name = data_path.rsplit(".", 1)
+            owner = obj.path_resolve(owner_path)
+        else:
+            owner, name = obj, data_path
+        
+        if index != -1:
+            array = getattr(owner, name)
+            if abs(array[index] - value) > 1e-6: array[index] = value
+        else:
+            if isinstance(getattr(owner, name), int): value = int(value)
+            setattr_cmp(owner, name, value, 1e-6)
+    
+    def _set_length_value(self, obj, data_path, index, coefficients, inverse=False):
+        L = self._get_main_cable_settings().length
+        x = (1.0 / max(L, 1e-6) if inverse else L)
+        self._set_driven_value(obj, data_path, index, coefficients, x)
+    
+    def _set_length_scale_value(self, obj, data_path, index, coefficients):
+        main_self = self._get_main_cable_settings()
+        encapsulator = main_self._get_child(main_self.id_data, "CABLE_EXTRAS")
+        dimensions = (encapsulator.dimensions if encapsulator else Vector((1,1,1)))
+        L = main_self.length
+        x = L * math.sqrt(3.0 / max(dimensions.length_squared, 1e-12))
+        self._set_driven_value(obj, data_path, index, coefficients, x)
+    
+    def _set_length_dependent(self, obj, data_path, index, coefficients, inverse=False):
+        if self.use_direct_values:
+            self._set_length_value(obj, data_path, index, coefficients, inverse=inverse)
+        else:
+            self._set_length_driver(obj, data_path, index, coefficients, inverse=inverse)
+    
+    def _set_length_scale_dependent(self, obj, data_path, index, coefficients):
+        if self.use_direct_values:
+            self._set_length_scale_value(obj, data_path, index, coefficients)
+        else:
+            self._set_length_scale_driver(obj, data_path, index, self.length_scale_expression, coefficients)
+    
+    def update_direct_values(self):
+        self = self._get_main_cable_settings()
+        if self.driver_mode != 'DIRECT': return
+        self._wire_length_update()
+        for attachment_obj in self.attachment_iter():
+            attachment_obj.cable_settings._attachment_length_update()
+    
+    def driver_kind(self, fcurve):
+        # Classifies drivers created by _set_length_driver ('LENGTH'),
+        # _set_scale_driver ('SCALE') and _set_length_scale_driver ('LENGTH_SCALE')
+        uses_length = False
+        uses_scale = False
+        for var in fcurve.driver.variables:
+            target = var.targets[0]
+            if not target.id: continue
+            if target.data_path.startswith("dimensions."):
+                uses_scale = True
+            else:
+                uses_length = True
+        if uses_length and uses_scale: return 'LENGTH_SCALE'
+        if uses_length: return 'LENGTH'
+        if uses_scale: return 'SCALE'
+        return 'OTHER'
+    
+    # Proxy display: wires/attachments are hidden and a lightweight
+    # polyline overlay of the curve is drawn instead
+    def on_proxy_mode_changed(self, context):
+        self.proxy_update()
+    
+    proxy_mode = 'OFF' | prop("When to display a lightweight proxy instead of wires and attachments", "Proxy mode", update=on_proxy_mode_changed, items=[
+        ('OFF', "Full", "Always display full geometry"),
+        ('AUTO', "Auto", "Display proxy during viewport navigation"),
+        ('ON', "Proxy", "Always display proxy"),
+    ])
+    proxy_active = False | prop("Proxy is currently displayed", "Proxy active")
+    proxy_hidden = False | prop("Hidden because of proxy display", "Proxy hidden") # on children
+    
+    def proxy_update(self, navigating=None):
+        self = self._get_main_cable_settings()
+        if navigating is None: navigating = proxy_state["navigating"]
+        enabled = (self.proxy_mode == 'ON') or ((self.proxy_mode == 'AUTO') and navigating)
+        self.proxy_set(enabled)
+    
+    def proxy_set(self, enabled):
+        self = self._get_main_cable_settings()
+        if self.proxy_active == enabled: return
+        self.proxy_active = enabled
+        cable_objects = self.collect_cable_objects(tags=self.tags_visible)
+        if not cable_objects: return
+        for child in cable_objects:
+            child_settings = child.cable_settings
+            if enabled:
+                if not child.hide:
+                    child.hide = True
+                    child_settings.proxy_hidden = True
+            elif child_settings.proxy_hidden:
+                child.hide = False
+                child_settings.proxy_hidden = False
+        
+        # Length-dependent values (direct values, or driver coefficients
+        # in DRIVERS mode) aren't updated for hidden children
+        if not enabled:
+            with self.batch():
+                self._wire_length_update()
+                for attachment_obj in self.attachment_iter():
+                    attachment_obj.cable_settings._attachment_length_update()
+    
+    def proxy_polyline(self, max_resolution=8):
+        # World-space points of the curve (cached until the curve/matrix changes)
+        self = self._get_main_cable_settings()
+        obj, curve = self.get_obj_curve()
+        table = self.length_table()
+        if not table: return None
+        geometry = table.geometry
+        if (not geometry) or (geometry.count == 0): return None
+        matrix = tuple(tuple(row) for row in obj.matrix_world)
+        key = obj.as_pointer()
+        cached = proxy_polylines.get(key)
+        if cached and (cached[0] is geometry) and (cached[1] == matrix): return cached[2]
+        
+        resolution = min(max(curve.resolution_u, 1), max_resolution)
+        seg = np.append(np.repeat(np.arange(geometry.count), resolution), geometry.count - 1)
+        t = np.append(np.tile(np.arange(resolution) / resolution, geometry.count), 1.0)
+        co = geometry.evaluate(seg, t)
+        m = np.array(obj.matrix_world)
+        points = (co.dot(m[:3, :3].T) + m[:3, 3]).tolist()
+        
+        proxy_polylines[key] = (geometry, matrix, points)
+        return points
+    
+    def driver_inventory(self):
+        # Yields (object, fcurve, kind) for all drivers in the cable's hierarchy
+        self = self._get_main_cable_settings()
+        cable_objects = self.collect_cable_objects(include_self=True)
+        if not cable_objects: return
+        for cable_obj in cable_objects:
+            if not cable_obj.animation_data: continue
+            for fcurve in cable_obj.animation_data.drivers:
+                yield (cable_obj, fcurve, self.driver_kind(fcurve))
+    
     # Object-based properties
     def _get(self):
         obj, curve = self.get_obj_curve()
@@ -855,26 +1507,65 @@ class CableSettingsPG:
     split_angle = math.pi | prop("Angle above which to split edges", "Split Angle", get=_get, set=_set, min=0.0, max=math.pi, subtype='ANGLE', unit='ROTATION')
     
     # Wire-related methods & properties
-    def wire_update(self):
+    # Hashes of the inputs of the last wire/attachment build
+    # (stored in the file, so that they stay consistent with undo)
+    wire_fingerprint = "" | prop()
+    attachment_fingerprint = "" | prop()
+    
+    def _fingerprint(self, inputs):
+        return hashlib.sha1(repr(inputs).encode("utf-8")).hexdigest()
+    
+    def _id_pointer(self, id_obj):
+        return (id_obj.as_pointer() if id_obj else 0)
+    
+    def _wire_fingerprint(self):
+        obj, curve = self.get_obj_curve()
+        wire_obj = self._cable_child_get("WIRES")
+        wire_cap0_obj = (self._get_child(wire_obj, "WIRES_CAP0") if wire_obj else None)
+        wire_cap1_obj = (self._get_child(wire_obj, "WIRES_CAP1") if wire_obj else None)
+        wire_objs = (wire_obj, wire_cap0_obj, wire_cap1_obj)
+        return self._fingerprint((
+            self.driver_mode, self.wire_is_braided, self.wire_count, self.wire_scale,
+            self.wire_resolution, self.wire_step, self.wire_offset,
+            self.lod_level, self.lod_render_level,
+            self.wire_twisting, self.wire_twisting_align, self.wire_layout,
+            curve.extrude, curve.bevel_depth, self._id_pointer(obj),
+            [(self._id_pointer(child), self._id_pointer(child.data), len(child.modifiers))
+                if child else None for child in wire_objs],
+            [[self._id_pointer(slot.material) for slot in child.material_slots]
+                if child else None for child in wire_objs],
+        ))
+    
+    @property
+    def wire_possible(self):
+        obj, curve = self.get_obj_curve()
+        if not curve: return False
+        extrude_bevel = abs(curve.extrude) + abs(curve.bevel_depth)
+        return (self.wire_count > 0) and (self.wire_step > 0) and (extrude_bevel > 0)
+    
+    def wire_update(self, force=False):
+        with self.batch():
+            self._wire_update(force)
+    
+    def _wire_update(self, force=False):
         obj, curve = self.get_obj_curve()
         if not curve: return
         
-        extrude_bevel = abs(curve.extrude) + abs(curve.bevel_depth)
-        wire_possible = (self.wire_count > 0) and (self.wire_step > 0) and (extrude_bevel > 0)
-        if not wire_possible:
+        if (not force) and (self.wire_fingerprint == self._wire_fingerprint()): return
+        
+        if not self.wire_possible:
             wire_obj = self._cable_child_get("WIRES")
-            if wire_obj: # don't delete object/mesh, because it stores wire materials
-                mesh = wire_obj.data
-                bm = bmesh.new()
-                bm.to_mesh(mesh) # clear mesh
-                bm.free()
+            if wire_obj: # don't delete object, because it stores wire materials
                 self._cable_child_set_visibility(wire_obj, False)
                 wire_cap0_obj = self._get_child(wire_obj, "WIRES_CAP0", False)
                 self._cable_child_set_visibility(wire_cap0_obj, False)
                 wire_cap1_obj = self._get_child(wire_obj, "WIRES_CAP1", False)
                 self._cable_child_set_visibility(wire_cap1_obj, False)
+            self.wire_fingerprint = self._wire_fingerprint()
             return
         
+        self.update_length()
+        
         wire_obj = self._cable_child_get("WIRES", create=True, data='MESH')
         if not wire_obj: return
         self._cable_child_set_visibility(wire_obj, True)
@@ -883,6 +1574,9 @@ class CableSettingsPG:
         
         n = self.wire_count
         
+        n_materials = n
+        material_indices = np.arange(n, dtype=np.int32)
+        
         if wire_type == 'BUS':
             wire_twisting = 0.0
             bus_halfwidth = curve.extrude + curve.bevel_depth
@@ -890,127 +1584,93 @@ class CableSettingsPG:
         elif wire_type == 'BRAIDED':
             wire_twisting = self.wire_twisting
             outer_radius = curve.bevel_depth
-            if n == 1:
-                wire_base_radius = outer_radius
-                base_offset = 0.0
-                angle_offset = 0.0
-            elif n == 2:
-                wire_base_radius = outer_radius / 2
-                base_offset = outer_radius / 2
-                angle_offset = math.pi
-            else: # incircle of an isosceles triangle
-                # http://mathworld.wolfram.com/Inradius.html
-                angle_offset = (math.pi*2) / n
-                if outer_radius > 0:
-                    h = outer_radius
-                    a = 2 * h * math.tan(angle_offset / 2)
-                    r = (math.sqrt(a*a + 4*h*h) - a) * (a / (4*h))
-                    wire_base_radius = r
-                else:
-                    wire_base_radius = 0.0
-                base_offset = outer_radius - wire_base_radius
-        
-        mesh = wire_obj.data
-        
-        materials = mesh.materials
-        materials_delta = n - len(materials)
+            if self.wire_layout == 'RING':
+                wire_radius, r_offset, twist_direction_angle, angle_offset = braided_wire_layout_cached(
+                    n, outer_radius, wire_twisting, self.wire_offset, self.wire_twisting_align)
+                r_offsets = np.full(n, r_offset)
+                thetas = np.arange(n) * angle_offset
+            else:
+                wire_radius, rhos, thetas, layers = pack_circles_cached(n, outer_radius, self.wire_layout)
+                r_offsets = rhos + self.wire_offset
+                # Too many wires for a material per wire; use a material per layer
+                n_materials = int(layers.max()) + 1
+                material_indices = layers
+            if self.wire_twisting_align:
+                twist_direction_angles = -np.arctan(wire_twisting * r_offsets)
+            else:
+                twist_direction_angles = np.zeros(n)
+            wire_radii = np.full(n, wire_radius)
+            if (self.wire_layout != 'RING') and self.wire_twisting_align:
+                # Twist compensation (braided_wire_layout() does this for the ring):
+                # the cross-section of a twisted wire is stretched by 1/cos(angle)
+                # along the ring, so it fits into its packed circle when shrunk by cos(angle)
+                wire_radii *= np.cos(twist_direction_angles)
+        
+        # Note: in older versions, materials were linked to (per-cable) mesh data
+        materials = [material_slot.material for material_slot in wire_obj.material_slots]
+        materials_delta = n_materials - len(materials)
         if materials_delta > 0:
             last_material = (materials[-1] if len(materials) > 0 else None)
-            for i in range(materials_delta):
-                materials.append(last_material)
+            materials.extend([last_material] * materials_delta)
         elif materials_delta < 0:
             pass # deleting material slots is probably undesirable
-            #for i in range(abs(materials_delta)):
-            #    materials.pop(-1, False)
         
-        # Note: even bm_cap = bm.copy() seems to cause crashes when bm_cap.to_mesh(cap_mesh) is used
-        bm = bmesh.new()
-        bm_cap = bmesh.new() # completely independent to avoid crashes
+        res = self.wire_resolution_lod
+        
+        # Same vertex order as bmesh.ops.create_circle() (starts at the top)
+        phi = np.arange(res) * ((2 * math.pi) / res)
+        circle = np.column_stack((-np.sin(phi), np.cos(phi), np.zeros(res)))
         
         if wire_type == 'BUS':
             wire_radius = wire_base_radius * self.wire_scale * 0.995
             
             w_step = (bus_halfwidth*2) / n
             
-            for i in range(n):
-                matrix = Matrix.Translation(Vector((self.wire_offset, (i+0.5)*w_step - bus_halfwidth, 0)))
-                try:
-                    bmesh.ops.create_circle(bm, cap_ends=True, cap_tris=False, segments=self.wire_resolution, diameter=wire_radius, matrix=matrix)
-                    bmesh.ops.create_circle(bm_cap, cap_ends=True, cap_tris=False, segments=self.wire_resolution, diameter=wire_radius, matrix=matrix)
-                except TypeError: # quick fix for Blender 2.79.6
-                    bmesh.ops.create_circle(bm, cap_ends=True, cap_tris=False, segments=self.wire_resolution, radius=wire_radius, matrix=matrix)
-                    bmesh.ops.create_circle(bm_cap, cap_ends=True, cap_tris=False, segments=self.wire_resolution, radius=wire_radius, matrix=matrix)
+            offsets = np.zeros((n, 3))
+            offsets[:, 0] = self.wire_offset
+            offsets[:, 1] = (np.arange(n) + 0.5) * w_step - bus_halfwidth
+            
+            wire_co = (circle * wire_radius)[np.newaxis, :, :] + offsets[:, np.newaxis, :]
         elif wire_type == 'BRAIDED':
-            # 1st iteration: find approximate radius
-            # 2nd interation: adjust offset so that wire sticks to the outer radius
-            for i in range(2):
-                r_offset = base_offset + self.wire_offset
-                
-                twist_direction_angle = -math.atan(wire_twisting * r_offset)
-                if not self.wire_twisting_align: twist_direction_angle = 0.0
-                
-                matrix0 = Matrix.Rotation(twist_direction_angle, 4, Vector((0, 1, 0)))
-                matrix0 = Matrix.Translation(Vector((0, r_offset, 0))) * matrix0
-                
-                if (abs(twist_direction_angle) > 0) and (abs(wire_twisting) > 1e-6):
-                    one_cycle_offset = (2 * math.pi) / wire_twisting
-                    one_wire_offset = one_cycle_offset / n
-                    
-                    delta_arc = math.cos(abs(twist_direction_angle)) * one_wire_offset
-                    delta_arc_L = math.cos(abs(twist_direction_angle)) * delta_arc
-                    delta_arc_R = math.sin(abs(twist_direction_angle)) * delta_arc
-                    delta_arc_W = delta_arc_R / r_offset # angle
-                    
-                    vA0 = Vector(matrix0.translation)
-                    vA1 = Matrix.Rotation(delta_arc_W, 4, Vector((0, 0, 1))) * vA0
-                    vA1.z = one_wire_offset - delta_arc_L
-                    
-                    wire_radius = min(wire_base_radius, (vA1 - vA0).magnitude * 0.5)
-                    base_offset = outer_radius - wire_radius
-                else:
-                    wire_radius = wire_base_radius
+            wire_radii = wire_radii * self.wire_scale * 0.995
             
-            wire_radius = wire_radius * self.wire_scale * 0.995
+            # Each wire profile is rotated around Y by its twist direction
+            # angle, moved to its radial offset, and rotated around Z
+            base_co = circle[np.newaxis, :, :] * wire_radii[:, np.newaxis, np.newaxis]
+            cos_t = np.cos(twist_direction_angles)[:, np.newaxis]
+            sin_t = np.sin(twist_direction_angles)[:, np.newaxis]
+            local_x = cos_t * base_co[:, :, 0]
+            local_y = base_co[:, :, 1] + r_offsets[:, np.newaxis]
+            local_z = -sin_t * base_co[:, :, 0]
             
-            for i in range(n):
-                matrix = Matrix.Rotation(i*angle_offset, 4, Vector((0, 0, 1))) * matrix0
-                try:
-                    bmesh.ops.create_circle(bm, cap_ends=True, cap_tris=False, segments=self.wire_resolution, diameter=wire_radius, matrix=matrix)
-                    bmesh.ops.create_circle(bm_cap, cap_ends=True, cap_tris=False, segments=self.wire_resolution, diameter=wire_radius, matrix=matrix)
-                except TypeError: # quick fix for Blender 2.79.6
-                    bmesh.ops.create_circle(bm, cap_ends=True, cap_tris=False, segments=self.wire_resolution, radius=wire_radius, matrix=matrix)
-                    bmesh.ops.create_circle(bm_cap, cap_ends=True, cap_tris=False, segments=self.wire_resolution, radius=wire_radius, matrix=matrix)
-        
-        for id, face in enumerate(bm.faces):
-            face.smooth = True
-            face.material_index = id
-        
-        for id, face in enumerate(bm_cap.faces):
-            face.smooth = False
-            face.material_index = id
-        
-        bm.to_mesh(mesh)
-        bm.free()
+            cos_a = np.cos(thetas)[:, np.newaxis]
+            sin_a = np.sin(thetas)[:, np.newaxis]
+            wire_co = np.empty((n, res, 3))
+            wire_co[:, :, 0] = cos_a * local_x - sin_a * local_y
+            wire_co[:, :, 1] = sin_a * local_x + cos_a * local_y
+            wire_co[:, :, 2] = local_z
         
-        # Note: compensation scale = (3 ^ 0.5) / ((scale.x^2 + scale.y^2 + scale.z^2) ^ 0.5)
-        def drive_by_length_scale(target, data_path, index, expresion, coefficients):
-            if isinstance(target, bpy.types.Modifier):
-                data_path = "modifiers[\"{}\"].{}".format(target.name, data_path)
-                target = wire_obj
-            elif isinstance(target, bpy.types.Constraint):
-                data_path = "constraints[\"{}\"].{}".format(target.name, data_path)
-                target = wire_obj
-            self._set_length_scale_driver(target, data_path, index, expresion, coefficients)
+        # One n-gon per wire
+        loop_totals = np.full(n, res, dtype=np.int32)
+        
+        def profile_builder(smooth):
+            def build(mesh):
+                BlUtil.Mesh.from_polygons(mesh, wire_co, loop_totals, smooth=smooth, material_index=material_indices)
+                for i in range(len(materials)):
+                    mesh.materials.append(None)
+            return build
+        
+        wire_co = wire_co.astype(np.float32)
+        profile_key = hashlib.sha1(wire_co.tobytes() + repr((n, res, len(materials))).encode("utf-8")).hexdigest()
+        
+        mesh = wire_profile_cache.get(profile_key+":WIRES", profile_builder(True))
+        self._set_wire_mesh(wire_obj, mesh, materials)
         
         md_screw = self._get_modifier(wire_obj, 'SCREW', True)
-        drive_by_length_scale(md_screw, "angle", -1, "L * sqrt(3.0 / (SX*SX + SY*SY + SZ*SZ))", (0.0, wire_twisting))
-        drive_by_length_scale(md_screw, "steps", -1, "L * sqrt(3.0 / (SX*SX + SY*SY + SZ*SZ))", (0.0, 1.0/self.wire_step))
-        drive_by_length_scale(md_screw, "screw_offset", -1, "L * sqrt(3.0 / (SX*SX + SY*SY + SZ*SZ))", (0.0, 1.0))
         md_screw.axis = 'Z'
         md_screw.object = None
         md_screw.iterations = 1
         md_screw.use_object_screw_offset = False
-        md_screw.render_steps = md_screw.steps
         md_screw.use_normal_calculate = False
         md_screw.use_normal_flip = True
         md_screw.use_smooth_shade = True
@@ -1022,24 +1682,12 @@ class CableSettingsPG:
         md_curve.object = obj
         
         # Wire caps
-        wire_cap0_obj = self._get_child(wire_obj, "WIRES_CAP0", True, data='MESH')
-        cap_mesh = wire_cap0_obj.data
+        cap_mesh = wire_profile_cache.get(profile_key+":CAP", profile_builder(False))
+        wire_cap0_obj = self._get_child(wire_obj, "WIRES_CAP0", True, data=cap_mesh)
         wire_cap1_obj = self._get_child(wire_obj, "WIRES_CAP1", True, data=cap_mesh)
         
-        bm_cap.to_mesh(cap_mesh)
-        bm_cap.free()
-        
-        while len(cap_mesh.materials) > len(mesh.materials):
-            cap_mesh.materials.pop(-1, False)
-        
-        while len(cap_mesh.materials) < len(mesh.materials):
-            cap_mesh.materials.append(None)
-        
-        for i, material in enumerate(mesh.materials):
-            cap_mesh.materials[i] = material
-        
         self._cable_child_set_visibility(wire_cap0_obj, True)
-        wire_cap0_obj.data = cap_mesh
+        self._set_wire_mesh(wire_cap0_obj, cap_mesh, materials)
         wire_cap0_obj.location = Vector((0, 0, 0))
         wire_cap0_obj.rotation_euler = Euler((0, 0, 0))
         
@@ -1048,20 +1696,134 @@ class CableSettingsPG:
         md_curve.object = obj
         
         self._cable_child_set_visibility(wire_cap1_obj, True)
-        wire_cap1_obj.data = cap_mesh
-        drive_by_length_scale(wire_cap1_obj, "location", 2, "L * sqrt(3.0 / (SX*SX + SY*SY + SZ*SZ))", (0.0, 1.0))
-        drive_by_length_scale(wire_cap1_obj, "rotation_euler", 2, "L * sqrt(3.0 / (SX*SX + SY*SY + SZ*SZ))", (0.0, wire_twisting))
+        self._set_wire_mesh(wire_cap1_obj, cap_mesh, materials)
         
         md_curve = self._get_modifier(wire_cap1_obj, 'CURVE', True)
         md_curve.deform_axis = 'POS_Z'
         md_curve.object = obj
+        
+        self._wire_length_update(wire_obj)
+        
+        self.wire_fingerprint = self._wire_fingerprint()
+    
+    def _set_wire_mesh(self, wire_obj, mesh, materials):
+        prev_mesh = wire_obj.data
+        if prev_mesh != mesh:
+            wire_obj.data = mesh
+            wire_profile_cache.release(prev_mesh) # also removes older per-cable meshes
+        for material_slot, material in zip(wire_obj.material_slots, materials):
+            if material_slot.link != 'OBJECT': material_slot.link = 'OBJECT'
+            if material_slot.material != material: material_slot.material = material
+    
+    # Settings that depend on the cable length (via drivers or direct values)
+    def _wire_length_update(self, wire_obj=None):
+        if not wire_obj: wire_obj = self._cable_child_get("WIRES")
+        if not wire_obj: return
+        # A wire hidden only in the viewport (e.g. by wire_hide) still renders
+        if (not self.wire_possible) or (wire_obj.hide and wire_obj.hide_render): return
+        
+        wire_twisting = (self.wire_twisting if self.wire_is_braided else 0.0)
+        
+        # Note: compensation scale = (3 ^ 0.5) / ((scale.x^2 + scale.y^2 + scale.z^2) ^ 0.5)
+        def drive_by_length_scale(target, data_path, index, coefficients):
+            if isinstance(target, bpy.types.Modifier):
+                data_path = "modifiers[\"{}\"].{}".format(target.name, data_path)
+                target = wire_obj
+            elif isinstance(target, bpy.types.Constraint):
+                data_path = "constraints[\"{}\"].{}".format(target.name, data_path)
+                target = wire_obj
+            self._set_length_scale_dependent(target, data_path, index, coefficients)
+        
+        md_screw = self._get_modifier(wire_obj, 'SCREW', True)
+        drive_by_length_scale(md_screw, "angle", -1, (0.0, wire_twisting))
+        drive_by_length_scale(md_screw, "steps", -1, (0.0, (0.5 ** self.lod_level)/self.wire_step))
+        drive_by_length_scale(md_screw, "screw_offset", -1, (0.0, 1.0))
+        if self.lod_enabled:
+            drive_by_length_scale(md_screw, "render_steps", -1, (0.0, (0.5 ** self.lod_render_level)/self.wire_step))
+        else:
+            self._remove_driver_fcurve(wire_obj, "modifiers[\"{}\"].render_steps".format(md_screw.name))
+            md_screw.render_steps = md_screw.steps
+        
+        wire_cap1_obj = self._get_child(wire_obj, "WIRES_CAP1")
+        if wire_cap1_obj:
+            drive_by_length_scale(wire_cap1_obj, "location", 2, (0.0, 1.0))
+            drive_by_length_scale(wire_cap1_obj, "rotation_euler", 2, (0.0, wire_twisting))
+    
+    # Level of detail: wire resolution, screw steps and curve resolution
+    # are halved per level, depending on the on-screen thickness of the
+    # cable in the 3D views (viewport) and from the scene camera (render)
+    def on_lod_enabled_changed(self, context):
+        obj, curve = self.get_obj_curve()
+        if not curve: return
+        if self.lod_enabled:
+            self.lod_resolution_u = curve.resolution_u
+            self.lod_render_resolution_u = curve.render_resolution_u
+        else:
+            curve.resolution_u = self.lod_resolution_u
+            curve.render_resolution_u = self.lod_render_resolution_u
+        self.lod_update(*lod_views(context.scene))
+    
+    def on_lod_changed(self, context):
+        self.lod_update(*lod_views(context.scene))
+    
+    lod_enabled = False | prop("Reduce detail of cables that are small on screen", "Level of detail", update=on_lod_enabled_changed)
+    lod_size = 32.0 | prop("On-screen cable thickness (in pixels) below which detail is reduced", "LOD size", min=1.0, update=on_lod_changed)
+    lod_max_level = 3 | prop("Maximal number of times detail can be halved", "LOD max level", min=0, max=8, update=on_lod_changed)
+    lod_level = 0 | prop("Current viewport level of detail", "LOD level", min=0)
+    lod_render_level = 0 | prop("Current render level of detail", "LOD render level", min=0)
+    lod_resolution_u = 12 | prop("Curve preview resolution at full detail", "Preview resolution", min=1, max=1024, update=on_lod_changed)
+    lod_render_resolution_u = 0 | prop("Curve render resolution at full detail (0 = same as preview)", "Render resolution", min=0, max=1024, update=on_lod_changed)
+    
+    @property
+    def wire_resolution_lod(self):
+        # Wire profile mesh is the same for viewport and render
+        level = min(self.lod_level, self.lod_render_level)
+        return max(3, int(round(self.wire_resolution * (0.5 ** level))))
+    
+    def lod_update(self, viewport_views=(), render_views=()):
+        # Levels are kept as they are if there are no views of the given kind
+        self = self._get_main_cable_settings()
+        obj, curve = self.get_obj_curve()
+        if not curve: return
+        
+        if self.lod_enabled:
+            m = np.array(obj.matrix_world)
+            corners = np.array([tuple(corner) for corner in obj.bound_box]).dot(m[:3, :3].T) + m[:3, 3]
+            thickness = 2.0 * (abs(curve.bevel_depth) + abs(curve.extrude)) * matrix_scale_factor(m)
+            
+            def calc_level(views, level):
+                if not views: return level
+                pixels = thickness * max(lod_pixel_scale(view, corners) for view in views)
+                return lod_choose_level(pixels, self.lod_size, self.lod_max_level, level)
+            
+            lod_level = calc_level(viewport_views, self.lod_level)
+            lod_render_level = calc_level(render_views, self.lod_render_level)
+        else:
+            lod_level, lod_render_level = 0, 0
+        
+        changed = setattr_cmp(self, "lod_level", lod_level)
+        changed |= setattr_cmp(self, "lod_render_level", lod_render_level)
+        
+        path_changed = False
+        if self.lod_enabled:
+            resolution_u = self.lod_resolution_u
+            render_resolution_u = self.lod_render_resolution_u or resolution_u
+            path_changed = setattr_cmp(curve, "resolution_u", max(1, int(round(resolution_u * (0.5 ** lod_level)))))
+            setattr_cmp(curve, "render_resolution_u", max(1, int(round(render_resolution_u * (0.5 ** lod_render_level)))))
+        
+        if path_changed:
+            # The path (and thus the length that wires/attachments follow) depends on resolution_u
+            self.update_length()
+            self.update_direct_values()
+        
+        if changed: self.wire_update()
     
     def wire_material_ids(self):
         material_ids = []
         wire_obj = self._cable_child_get("WIRES")
         if wire_obj:
-            mesh = wire_obj.data
-            for material in mesh.materials:
+            for material_slot in wire_obj.material_slots:
+                material = material_slot.material
                 material_ids.append(material.as_pointer() if material else 0)
         return material_ids
     
@@ -1095,19 +1857,33 @@ class CableSettingsPG:
     wire_offset = 0.0 | prop("Wire offset", "Wire offset", subtype='DISTANCE', unit='LENGTH', step=0.1, precision=3, update=on_wire_changed)
     wire_twisting = 0.0 | prop("Wire twisting per unit length", "Wire twisting", subtype='ANGLE', unit='ROTATION', update=on_wire_changed)
     wire_twisting_align = True | prop("Align wire profile to twisting direction", "Wire align", update=on_wire_changed)
+    wire_layout = 'RING' | prop("Layout of braided wires", "Wire layout", update=on_wire_changed, items=[
+        ('RING', "Ring", "Single ring of wires along the outer radius"),
+        ('LAYERS', "Layers", "Concentric layers of wires"),
+        ('FILLED', "Filled", "Hexagonal packing of wires filling the whole radius"),
+    ])
+    
+    @property
+    def wire_material_count(self):
+        if self.wire_is_braided and (self.wire_layout != 'RING'):
+            obj, curve = self.get_obj_curve()
+            if not curve: return 0
+            radius, rhos, thetas, layers = pack_circles_cached(self.wire_count, curve.bevel_depth, self.wire_layout)
+            return (int(layers.max()) + 1 if len(layers) else 0)
+        return self.wire_count
     
     def _get(self):
         wire_obj = self._cable_child_get("WIRES")
         if not wire_obj: return False
-        return wire_obj.hide
+        return wire_obj.hide and (not wire_obj.cable_settings.proxy_hidden)
     def _set(self, value):
         wire_obj = self._cable_child_get("WIRES")
         if not wire_obj: return
-        wire_obj.hide = value
+        self._cable_child_set_hide(wire_obj, value)
         wire_cap0_obj = self._get_child(wire_obj, "WIRES_CAP0")
-        if wire_cap0_obj: wire_cap0_obj.hide = value
+        if wire_cap0_obj: self._cable_child_set_hide(wire_cap0_obj, value)
         wire_cap1_obj = self._get_child(wire_obj, "WIRES_CAP1")
-        if wire_cap1_obj: wire_cap1_obj.hide = value
+        if wire_cap1_obj: self._cable_child_set_hide(wire_cap1_obj, value)
     wire_hide = False | prop("Hide in viewport", "Hide", get=_get, set=_set)
     
     def _get(self):
@@ -1140,8 +1916,9 @@ class CableSettingsPG:
     
     # Attachment-related methods and properties (on the cable)
     def attachment_add(self):
-        attachment_obj = self._cable_child_add("ATTACHMENT", data='MESH:CHOOSE')
-        attachment_obj.cable_settings.attachment_update()
+        with self.batch():
+            attachment_obj = self._cable_child_add("ATTACHMENT", data='MESH:CHOOSE')
+            attachment_obj.cable_settings.attachment_update()
         return attachment_obj
     
     def attachment_delete(self, index):
@@ -1163,13 +1940,30 @@ class CableSettingsPG:
             template_ids.append(template.as_pointer() if template else 0)
         return template_ids
     
-    def attachment_update_all(self):
-        for attachment_obj in self.attachment_iter():
-            attachment_settings = attachment_obj.cable_settings
-            attachment_settings.attachment_update()
+    def attachment_update_all(self, force=False):
+        with self.batch():
+            for attachment_obj in self.attachment_iter():
+                attachment_settings = attachment_obj.cable_settings
+                attachment_settings.attachment_update(force)
     
     # Attachment-related methods and properties (on the attachments themselves)
-    def attachment_update(self):
+    def _attachment_fingerprint(self):
+        attachment_obj = self.id_data
+        template_data, template_prop = self.attachment_template_data_prop
+        template = (getattr(template_data, template_prop) if template_data else None)
+        main_self = self._get_main_cable_settings()
+        return self._fingerprint((
+            main_self.driver_mode, self._id_pointer(main_self.id_data),
+            self._id_pointer(attachment_obj.parent), self._id_pointer(attachment_obj.data),
+            self._id_pointer(template), len(attachment_obj.modifiers), len(attachment_obj.constraints),
+            self.attachment_template_type, self.attachment_deform, self.attachment_pos_absolute,
+            self.attachment_pos_relative, self.attachment_angle, self.attachment_scale,
+            self.attachment_forward_axis, self.attachment_array_use_length, self.attachment_array_count,
+            self.attachment_array_length_const, self.attachment_array_length_factor,
+            self.attachment_array_offset_abs, self.attachment_array_offset_rel,
+        ))
+    
+    def attachment_update(self, force=False):
         if self.tag != "ATTACHMENT": return
         attachment_obj = self.id_data
         
@@ -1182,6 +1976,10 @@ class CableSettingsPG:
         if obj.type != 'CURVE': return
         curve = obj.data
         
+        if (not force) and (self.attachment_fingerprint == self._attachment_fingerprint()): return
+        
+        self.update_length()
+        
         def enable_modifier(md, enable):
             md.show_render = enable
             md.show_viewport = enable
@@ -1189,26 +1987,7 @@ class CableSettingsPG:
         def enable_constraint(cn, enable):
             cn.mute = not enable
         
-        def switch_axis_driver(data_obj, data_path, driver_axis, size=3):
-            for i in range(size):
-                self._enable_driver_fcurve(data_obj, data_path, i, (i == driver_axis))
-        
-        def drive_modifier_by_length(md, data_path, index, coefs, switch=True, inverse=False):
-            data_obj = attachment_obj
-            data_path = "modifiers[\"{}\"].{}".format(md.name, data_path)
-            size = (switch if isinstance(switch, int) else 3)
-            if switch and (index != -1): switch_axis_driver(data_obj, data_path, driver_axis, size=size)
-            self._set_length_driver(data_obj, data_path, index, coefs, inverse=inverse)
-        
-        def drive_constraint_by_length(cn, data_path, index, coefs, switch=True, inverse=False):
-            data_obj = attachment_obj
-            data_path = "constraints[\"{}\"].{}".format(cn.name, data_path)
-            size = (switch if isinstance(switch, int) else 3)
-            if switch and (index != -1): switch_axis_driver(data_obj, data_path, driver_axis, size=size)
-            self._set_length_driver(data_obj, data_path, index, coefs, inverse=inverse)
-        
         driver_axis = self.driver_axis_map[self.attachment_forward_axis]
-        axis_sign = self.sign_axis_map[self.attachment_forward_axis]
         axis_vector = self.vector_axis_map[self.attachment_forward_axis]
         
         # Initialize modifiers in the correct order
@@ -1259,19 +2038,12 @@ class CableSettingsPG:
             material_slot.link = slot_link
         
         # Array modifier
-        if self.attachment_array_use_length:
-            use_array = ((self.attachment_array_length_const != 0) or (self.attachment_array_length_factor != 0))
-        else:
-            use_array = (self.attachment_array_count > 1)
-        use_array &= ((self.attachment_array_offset_abs != 0) or (self.attachment_array_offset_rel != 0))
-        use_array &= self.attachment_modifiers_possible
-        
+        use_array = self.attachment_use_array
         enable_modifier(md_array, use_array)
         if use_array:
             md_array.curve = obj
             if self.attachment_array_use_length:
                 md_array.fit_type = 'FIT_LENGTH'
-                drive_modifier_by_length(md_array, "fit_length", -1, (self.attachment_array_length_const, self.attachment_array_length_factor))
             else:
                 md_array.fit_type = 'FIXED_COUNT'
                 md_array.count = self.attachment_array_count
@@ -1287,7 +2059,7 @@ class CableSettingsPG:
         attachment_obj.scale = Vector((1,1,1)) * self.attachment_scale
         
         # constraints override loc/rot/scale drivers, so there's no necessity to mute/unmute drivers
-        use_deform = self.attachment_deform and self.attachment_modifiers_possible
+        use_deform = self.attachment_use_deform
         if use_deform:
             enable_modifier(md_curve, True)
             enable_constraint(cn_limit_loc, False)
@@ -1298,8 +2070,6 @@ class CableSettingsPG:
             md_curve.object = obj
             
             attachment_obj.location = Vector() # muting a driver doesn't revert the property values
-            switch_axis_driver(attachment_obj, "location", driver_axis)
-            self._set_length_driver(attachment_obj, "location", driver_axis, (axis_sign*self.attachment_pos_absolute, axis_sign*self.attachment_pos_relative))
             
             euler = Euler()
             euler[driver_axis] = self.attachment_angle
@@ -1356,7 +2126,68 @@ class CableSettingsPG:
             
             # We cannot do this because it will create a dependency cycle
             #self._set_length_driver(curve, "path_duration", -1, (0.0, 1.0))
-            
+        
+        
+        self._attachment_length_update()
+        
+        self.attachment_fingerprint = self._attachment_fingerprint()
+    
+    @property
+    def attachment_use_array(self):
+        if self.attachment_array_use_length:
+            use_array = ((self.attachment_array_length_const != 0) or (self.attachment_array_length_factor != 0))
+        else:
+            use_array = (self.attachment_array_count > 1)
+        use_array &= ((self.attachment_array_offset_abs != 0) or (self.attachment_array_offset_rel != 0))
+        use_array &= self.attachment_modifiers_possible
+        return use_array
+    
+    @property
+    def attachment_use_deform(self):
+        return self.attachment_deform and self.attachment_modifiers_possible
+    
+    # Settings that depend on the cable length (via drivers or direct values)
+    def _attachment_length_update(self):
+        if self.tag != "ATTACHMENT": return
+        attachment_obj = self.id_data
+        
+        use_direct_values = self.use_direct_values
+        
+        def switch_axis_driver(data_obj, data_path, driver_axis, size=3):
+            for i in range(size):
+                if i == driver_axis: continue
+                if use_direct_values:
+                    self._remove_driver_fcurve(data_obj, data_path, i)
+                else:
+                    self._enable_driver_fcurve(data_obj, data_path, i, False)
+            self._enable_driver_fcurve(data_obj, data_path, driver_axis, True)
+        
+        def drive_modifier_by_length(md, data_path, index, coefs, switch=True, inverse=False):
+            data_obj = attachment_obj
+            data_path = "modifiers[\"{}\"].{}".format(md.name, data_path)
+            size = (switch if isinstance(switch, int) else 3)
+            if switch and (index != -1): switch_axis_driver(data_obj, data_path, driver_axis, size=size)
+            self._set_length_dependent(data_obj, data_path, index, coefs, inverse=inverse)
+        
+        def drive_constraint_by_length(cn, data_path, index, coefs, switch=True, inverse=False):
+            data_obj = attachment_obj
+            data_path = "constraints[\"{}\"].{}".format(cn.name, data_path)
+            size = (switch if isinstance(switch, int) else 3)
+            if switch and (index != -1): switch_axis_driver(data_obj, data_path, driver_axis, size=size)
+            self._set_length_dependent(data_obj, data_path, index, coefs, inverse=inverse)
+        
+        driver_axis = self.driver_axis_map[self.attachment_forward_axis]
+        axis_sign = self.sign_axis_map[self.attachment_forward_axis]
+        
+        if self.attachment_use_array and self.attachment_array_use_length:
+            md_array = self._get_modifier(attachment_obj, 'ARRAY', True, name="Array")
+            drive_modifier_by_length(md_array, "fit_length", -1, (self.attachment_array_length_const, self.attachment_array_length_factor))
+        
+        if self.attachment_use_deform:
+            switch_axis_driver(attachment_obj, "location", driver_axis)
+            self._set_length_dependent(attachment_obj, "location", driver_axis, (axis_sign*self.attachment_pos_absolute, axis_sign*self.attachment_pos_relative))
+        else:
+            cn_follow_path = self._get_constraint(attachment_obj, 'FOLLOW_PATH', True, name="FollowPath")
             #drive_constraint_by_length(cn_follow_path, "offset", -1, (self.attachment_pos_absolute, self.attachment_pos_relative))
             drive_constraint_by_length(cn_follow_path, "offset_factor", -1, (self.attachment_pos_relative, self.attachment_pos_absolute), inverse=True)
     
@@ -1541,6 +2372,69 @@ def cable_unselect_children(self, context, event):
         if cable_objects.cable_settings.tag in tags_hide:
             child.hide = True
 
+def delete_hierarchy(scene, obj):
+    for child in obj.children:
+        delete_hierarchy(scene, child)
+    
+    try:
+        scene.objects.unlink(obj)
+        bpy.data.objects.remove(obj)
+    except Exception:
+        pass
+
+class CableMeshConverter:
+    "Converts a cable (with its visible children) to a mesh, possibly over several updates"
+    
+    def __init__(self, scene, obj):
+        self.scene = scene
+        self.obj = obj
+        self.name = obj.name
+        
+        obj.cable_settings.proxy_set(False) # restore the full geometry
+        cable_objects = self.collect_objects(obj)
+        
+        self.mesh_baker = MeshBaker(
+            scene=scene,
+            include=cable_objects,
+            selection=True,
+            dupli=True,
+            matrix=Matrix(obj.matrix_world),
+            collect_materials=True,
+            remove_doubles=0.0001,
+        )
+    
+    @staticmethod
+    def collect_objects(obj):
+        cable_settings = obj.cable_settings
+        include_self = not ((cable_settings.is_wireframe or obj.hide) and obj.hide_render)
+        cable_objects = cable_settings.collect_cable_objects(include_self=include_self, tags=CableSettingsPG.tags_visible)
+        return [cable_obj for cable_obj in cable_objects if not cable_obj.hide]
+    
+    finished = property(lambda self: self.mesh_baker.finished)
+    
+    @property
+    def progress(self):
+        total = len(self.mesh_baker.objects)
+        return (min(self.mesh_baker.counter / total, 1.0) if total else 1.0)
+    
+    def update(self, dt=None):
+        self.mesh_baker.update(dt)
+    
+    def cancel(self):
+        self.mesh_baker.cleanup()
+    
+    def finish(self):
+        res_obj = self.mesh_baker.object('FORGET', update=False) # scene is updated later anyway
+        self.mesh_baker.cleanup()
+        
+        delete_hierarchy(self.scene, self.obj)
+        self.obj = None
+        
+        res_obj.name = self.name
+        res_obj.data.name = self.name
+        
+        return res_obj
+
 @addon.Operator(idname="object.cable_to_mesh", description="Convert cable to mesh")
 def cable_to_mesh(self, context, event):
     obj = context.object
@@ -1551,45 +2445,270 @@ def cable_to_mesh(self, context, event):
     
     if obj.mode != 'OBJECT': bpy.ops.object.mode_set(mode='OBJECT')
     
-    name = obj.name
-    
-    include_self = not ((cable_settings.is_wireframe or obj.hide) and obj.hide_render)
-    cable_objects = cable_settings.collect_cable_objects(include_self=include_self, tags=CableSettingsPG.tags_visible)
-    cable_objects = [cable_obj for cable_obj in cable_objects if not cable_obj.hide]
-    
-    mesh_baker = MeshBaker(
-        scene=context.scene,
-        include=cable_objects,
-        selection=True,
-        dupli=True,
-        matrix=Matrix(obj.matrix_world),
-        collect_materials=True,
-        remove_doubles=0.0001,
-    )
-    mesh_baker.update()
-    res_obj = mesh_baker.object('FORGET')
-    mesh_baker.cleanup()
-    
-    def recursive_delete(parent):
-        for child in parent.children:
-            recursive_delete(child)
-        
-        try:
-            bpy.context.scene.objects.unlink(parent)
-            bpy.data.objects.remove(parent)
-        except Exception:
-            pass
-    
-    recursive_delete(obj)
-    
-    res_obj.name = name
-    res_obj.data.name = name
+    converter = CableMeshConverter(context.scene, obj)
+    converter.update()
+    res_obj = converter.finish()
+    wire_profile_cache.evict()
     
     res_obj.select = True
     context.scene.objects.active = res_obj
     
     bpy.ops.ed.undo_push(message="Cable to mesh")
 
+@addon.Operator(idname="object.cables_to_mesh", label="Convert cables to mesh", description="Convert selected (or all) cables to meshes (Esc to stop)")
+class CablesToMeshOperator:
+    use_selected = True | prop("Convert only selected cables", "Selected only")
+    time_step = 0.1 | prop("Time spent on conversion between UI updates", "Time step", subtype='TIME', unit='TIME', min=0.01)
+    
+    def invoke(self, context, event):
+        scene = context.scene
+        
+        if context.mode != 'OBJECT': bpy.ops.object.mode_set(mode='OBJECT')
+        
+        cables = list(iter_cables(scene))
+        if self.use_selected: cables = [obj for obj in cables if obj.select]
+        if not cables:
+            self.report({'INFO'}, "No cables to convert")
+            return {'CANCELLED'}
+        
+        # Cables are referenced by name, since they may be deleted along with other cables
+        self.names = [obj.name for obj in cables]
+        self.index = 0
+        self.converter = None
+        self.results = []
+        
+        wm = context.window_manager
+        wm.progress_begin(0.0, 1.0)
+        self.timer = wm.event_timer_add(0.01, context.window)
+        return {'RUNNING_MODAL'}
+    
+    def modal(self, context, event):
+        if event.type == 'ESC': return self.finish(context, cancelled=True)
+        if event.type != 'TIMER': return {'RUNNING_MODAL'}
+        
+        time_stop = time.perf_counter() + self.time_step
+        while time.perf_counter() < time_stop:
+            if not self.converter:
+                if self.index >= len(self.names): return self.finish(context)
+                obj = context.scene.objects.get(self.names[self.index])
+                self.index += 1
+                if not (obj and obj.cable_settings.get_obj_curve()): continue
+                self.converter = CableMeshConverter(context.scene, obj)
+            
+            self.converter.update(max(time_stop - time.perf_counter(), 0.0))
+            
+            if self.converter.finished:
+                self.results.append(self.converter.finish())
+                self.converter = None
+        
+        progress = self.index - (1.0 - self.converter.progress if self.converter else 0.0)
+        context.window_manager.progress_update(progress / len(self.names))
+        return {'RUNNING_MODAL'}
+    
+    def finish(self, context, cancelled=False):
+        if self.converter:
+            self.converter.cancel()
+            self.converter = None
+        
+        wm = context.window_manager
+        wm.progress_end()
+        wm.event_timer_remove(self.timer)
+        
+        wire_profile_cache.evict()
+        
+        for res_obj in self.results:
+            res_obj.select = True
+        if self.results: context.scene.objects.active = self.results[-1]
+        
+        # A single undo step for all conversions (including the cancelled batch's)
+        if self.results: bpy.ops.ed.undo_push(message="Cables to mesh")
+        
+        self.report({'INFO'}, "Converted {} of {} cables".format(len(self.results), len(self.names)))
+        
+        return ({'CANCELLED'} if cancelled else {'FINISHED'})
+
+cable_export_writers = {'PLY': PlyWriter, 'OBJ': ObjWriter}
+
+def export_cables(scene, cables, filepath, file_format='PLY'):
+    "Streams baked cables (in world space) to a file; the scene is left as it was"
+    # On errors, the writer removes the incomplete file
+    with cable_export_writers[file_format](filepath) as writer:
+        for obj in cables:
+            cable_settings = obj.cable_settings
+            proxy_active = cable_settings.proxy_active
+            cable_settings.proxy_set(False) # wires aren't updated while hidden
+            try:
+                writer.begin_object(obj.name)
+                mesh_baker = MeshBaker(
+                    scene=scene,
+                    include=CableMeshConverter.collect_objects(obj),
+                    selection=True,
+                    dupli=True,
+                    collect_materials=True,
+                    sink=writer,
+                )
+                mesh_baker.update()
+                mesh_baker.cleanup()
+            finally:
+                cable_settings.proxy_set(proxy_active)
+        
+        return writer.vertex_count, writer.face_count
+
+@addon.Operator(idname="object.cables_export", label="Export cables", description="Export baked cables to a PLY or OBJ file without converting them")
+class CablesExportOperator:
+    filepath = "" | prop("Path of the exported file", "File path", subtype='FILE_PATH')
+    file_format = 'PLY' | prop("File format", "Format", items=[
+        ('PLY', "PLY", "Binary PLY"),
+        ('OBJ', "OBJ", "Wavefront OBJ"),
+    ])
+    use_selected = True | prop("Export only selected cables", "Selected only")
+    
+    def execute(self, context):
+        scene = context.scene
+        
+        cables = list(iter_cables(scene))
+        if self.use_selected: cables = [obj for obj in cables if obj.select]
+        if not cables:
+            self.report({'INFO'}, "No cables to export")
+            return {'CANCELLED'}
+        
+        filepath = bpy.path.ensure_ext(bpy.path.abspath(self.filepath), "." + self.file_format.lower())
+        
+        if context.mode != 'OBJECT': bpy.ops.object.mode_set(mode='OBJECT')
+        
+        vertex_count, face_count = export_cables(scene, cables, filepath, self.file_format)
+        
+        self.report({'INFO'}, "Exported {} cables ({} verts, {} faces) to {}".format(len(cables), vertex_count, face_count, filepath))
+        
+        return {'FINISHED'}
+    
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = bpy.path.ensure_ext(bpy.path.abspath("//cables"), "." + self.file_format.lower())
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self)
+
+def iter_cables(scene):
+    for obj in scene.objects:
+        if obj.type != 'CURVE': continue
+        cable_settings = obj.cable_settings
+        if not cable_settings._get_child(obj, "CABLE_EXTRAS"): continue
+        yield obj
+
+def driver_evaluator(fcurve):
+    # Evaluates the driver the way Blender does (reads the variables,
+    # then evaluates the scripted expression in the driver namespace)
+    driver = fcurve.driver
+    targets = [(var.name, var.targets[0]) for var in driver.variables if var.type == 'SINGLE_PROP']
+    try:
+        code = compile(driver.expression, "<driver>", "eval")
+    except SyntaxError:
+        code = None
+    namespace = dict(bpy.app.driver_namespace)
+    
+    def evaluate():
+        values = {}
+        for name, target in targets:
+            try:
+                values[name] = (target.id.path_resolve(target.data_path) if target.id else 0.0)
+            except ValueError:
+                values[name] = 0.0
+        return (eval(code, namespace, values) if code else 0.0)
+    
+    return evaluate
+
+def profile_cable_drivers(scene, cables=None, repeats=100, frame_repeats=3):
+    """
+    Measures the evaluation cost of cable drivers. Each driver's variables
+    and expression are evaluated directly (repeats times), which doesn't
+    require scene updates; the total effect on the scene evaluation is
+    measured once, with all cable drivers muted and unmuted (frame_repeats
+    frame_set() calls each). Returns a dict with "baseline", "total",
+    "drivers", "cables" and "kinds" entries.
+    """
+    if cables is None: cables = list(iter_cables(scene))
+    
+    inventory = []
+    for obj in cables:
+        for cable_obj, fcurve, kind in obj.cable_settings.driver_inventory():
+            if fcurve.mute: continue # muted by the user or by attachment_update
+            inventory.append((obj, cable_obj, fcurve, kind))
+    
+    frame = scene.frame_current
+    active_obj = scene.objects.active
+    selected = [obj for obj in scene.objects if obj.select]
+    
+    def measure_frames():
+        time_start = time.perf_counter()
+        for i in range(frame_repeats):
+            scene.frame_set(frame)
+        return (time.perf_counter() - time_start) / frame_repeats
+    
+    drivers = []
+    try:
+        for obj, cable_obj, fcurve, kind in inventory:
+            evaluate = driver_evaluator(fcurve)
+            time_start = time.perf_counter()
+            for i in range(repeats):
+                evaluate()
+            cost = (time.perf_counter() - time_start) / repeats
+            drivers.append((obj.name, cable_obj.name, fcurve.data_path, fcurve.array_index, kind, cost))
+        
+        total = measure_frames()
+        for obj, cable_obj, fcurve, kind in inventory:
+            fcurve.mute = True
+        baseline = measure_frames()
+    finally:
+        for obj, cable_obj, fcurve, kind in inventory:
+            fcurve.mute = False
+        scene.frame_set(frame)
+        for obj in scene.objects:
+            select = (obj in selected)
+            if obj.select != select: obj.select = select
+        if scene.objects.active != active_obj: scene.objects.active = active_obj
+    
+    cables_cost = {obj.name:0.0 for obj in cables}
+    kinds_cost = {}
+    for cable_name, obj_name, data_path, index, kind, cost in drivers:
+        cables_cost[cable_name] += cost
+        kinds_cost[kind] = kinds_cost.get(kind, 0.0) + cost
+    
+    return dict(baseline=baseline, total=max(total - baseline, 0.0), drivers=drivers, cables=cables_cost, kinds=kinds_cost)
+
+@addon.Operator(idname="object.cable_profile_drivers", label="Profile cable drivers", description="Measure evaluation cost of cable drivers (see console for details)")
+class CableProfileDriversOperator:
+    use_selected = True | prop("Profile only selected cables", "Selected only")
+    repeats = 100 | prop("Number of evaluations per driver", "Repeats", min=1)
+    frame_repeats = 3 | prop("Number of frame updates per scene measurement", "Frame repeats", min=1)
+    
+    def execute(self, context):
+        scene = context.scene
+        
+        cables = list(iter_cables(scene))
+        if self.use_selected: cables = [obj for obj in cables if obj.select]
+        
+        report = profile_cable_drivers(scene, cables, self.repeats, self.frame_repeats)
+        
+        ms = 1000.0
+        print("Cable drivers profile (baseline: {:.3f} ms per update, cable drivers add {:.3f} ms)".format(report["baseline"]*ms, report["total"]*ms))
+        for cable_name, obj_name, data_path, index, kind, cost in sorted(report["drivers"], key=(lambda item: -item[-1])):
+            print("  {:.3f} ms  {}  {}: {}[{}]  ({})".format(cost*ms, cable_name, obj_name, data_path, index, kind))
+        print("Per cable:")
+        for cable_name, cost in sorted(report["cables"].items(), key=(lambda item: -item[1])):
+            print("  {:.3f} ms  {}".format(cost*ms, cable_name))
+        print("Per driver kind:")
+        for kind, cost in sorted(report["kinds"].items(), key=(lambda item: -item[1])):
+            print("  {:.3f} ms  {}".format(cost*ms, kind))
+        
+        total = sum(report["cables"].values())
+        self.report({'INFO'}, "{} drivers in {} cables: {:.3f} ms per evaluation".format(len(report["drivers"]), len(cables), total*ms))
+        
+        return {'FINISHED'}
+    
+    def invoke(self, context, event):
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self)
+
 @addon.Operator(idname="object.cable_auto_twist", label="Auto twist curve")
 class CableAutoTwistOperator:
     fix_start = True | prop("Fix start", "Fix start")
@@ -1597,45 +2716,61 @@ class CableAutoTwistOperator:
     angle_start = 0.0 | prop("Start angle", "Start angle", subtype='ANGLE', unit='ROTATION')
     angle_end = 0.0 | prop("End angle", "End angle", subtype='ANGLE', unit='ROTATION')
     mode = 'CURVE' | prop("Angle interpretation", "Angle per", items=[
-        # mapping distance along curve to control points can be complicated, especially for NURBS
-        #('LENGTH', "Length", "Angle per unit length"),
+        ('LENGTH', "Length", "Angle per unit length"),
         ('SEGMENT', "Segment", "Angle per curve segment"),
         ('CURVE', "Curve", "Angle per whole curve"),
+        ('MINIMAL', "Minimal", "Angle per whole curve (distributed by length), "
+            "added to the tilt that cancels the torsion of the curve"),
     ])
     angle = 0.0 | prop("Angle", "Angle", subtype='ANGLE', unit='ROTATION')
     
     def execute(self, context):
-        n_segments = len(self.points) - 1
-        if self.fix_start and self.fix_end:
-            angle0 = self.angle_start
-            angle_delta = clamp_angle(self.angle_end - self.angle_start)
-            twopi = math.pi*2
-            n = round(abs(self.angle) / twopi)
-            angle1 = angle0 + angle_delta + math.copysign(twopi * n, self.angle)
-            angle_step = ((angle1 - angle0) / n_segments if n_segments > 0 else 0.0)
-            print((math.degrees(angle0), math.degrees(angle1), math.degrees(angle_step)))
+        n = len(self.points)
+        twopi = math.pi*2
+        
+        # Position of each point in units of the mode's angle,
+        # and the tilts that the angle is added to
+        base = np.zeros(n)
+        if self.mode in ('LENGTH', 'MINIMAL'):
+            table = self.cable_settings.length_table()
+            u = table.length_at_points() * self.cable_settings.length_scale
+            if self.mode == 'MINIMAL':
+                u = (u / u[-1] if u[-1] > 0 else np.zeros(n))
+                if self.spline.twist_mode == 'TANGENT':
+                    # The tangent-mode frame follows the curvature (there's no fixed
+                    # reference to correct against), so use Blender's own minimum-twist
+                    # frame instead; it needs no correction
+                    self.spline.twist_mode = 'MINIMUM'
+                if self.spline.twist_mode == 'Z_UP':
+                    # minimal_twist() measures the rotation relative to the Z-up frame
+                    base = minimal_twist(table.geometry, *table.geometry.point_params())
         elif self.mode == 'SEGMENT':
-            angle_step = self.angle
-            if self.fix_start:
-                angle0 = self.angle_start
-            else:
-                angle0 = self.angle_end - angle_step * n_segments
-                angle1 = self.angle_end
-        elif self.mode == 'CURVE':
-            angle_step = (self.angle / n_segments if n_segments > 0 else 0.0)
+            u = np.arange(n, dtype=np.float64)
+        else: # CURVE
+            u = np.arange(n) / max(n-1, 1)
+        
+        if self.fix_start and self.fix_end:
+            fraction = (u / u[-1] if u[-1] > 0 else np.zeros(n))
+            # Whole turns to add on top of the difference between the ends
+            # (in LENGTH mode, the angle is per unit length)
+            angle_total = (self.angle * u[-1] if self.mode == 'LENGTH' else self.angle)
+            angle_delta = clamp_angle(self.angle_end - self.angle_start - base[-1])
+            n_turns = round(abs(angle_total) / twopi)
+            angle_delta += math.copysign(twopi * n_turns, angle_total)
+            tilts = self.angle_start + base + fraction * angle_delta
+        else:
+            tilts = base + self.angle * u
             if self.fix_start:
-                angle0 = self.angle_start
+                tilts += self.angle_start
             else:
-                angle0 = self.angle_end - angle_step * n_segments
-                angle1 = self.angle_end
-        
-        angle = angle0
-        for point in self.points:
-            point.tilt = angle
-            angle += angle_step
+                tilts += self.angle_end - tilts[-1]
         
+        tilts = tilts.astype(np.float32)
         if self.fix_end and (not self.fix_start):
-            self.points[-1].tilt = angle1 # to not accumulate errors
+            tilts[-1] = self.angle_end # to not accumulate errors
+        
+        self.points.foreach_set("tilt", tilts)
+        self.spline.id_data.update_tag()
         
         return {'FINISHED'}
     
@@ -1680,29 +2815,80 @@ class CableAutoTwistOperator:
 
 addon.type_extend("Object", "cable_settings", CableSettingsPG)
 
-prev_template_ids = None
-prev_material_ids = None
+# Dirty-flag tracking for scene_update_post: the refreshes below are
+# performed only when the relevant datablocks were actually updated
+# (is_updated flags are cleared by Blender after each scene update)
+cable_update_state = dict(active=None, layers=None, material_ids={}, template_ids={})
+
+@addon.load_post
+def reset_cable_update_state():
+    cable_update_state.update(active=None, layers=None, material_ids={}, template_ids={})
+
+def data_is_updated():
+    return (bpy.data.objects.is_updated or bpy.data.curves.is_updated or bpy.data.meshes.is_updated)
+
+def cable_is_updated(obj):
+    if obj.is_updated or obj.is_updated_data: return True
+    cable_objects = obj.cable_settings.collect_cable_objects()
+    if not cable_objects: return False
+    return any((cable_obj.is_updated or cable_obj.is_updated_data) for cable_obj in cable_objects)
+
+def update_cable_lengths(scene):
+    for obj in scene.objects:
+        if obj.type != 'CURVE': continue
+        if not (obj.is_updated or obj.is_updated_data): continue
+        cable_settings = obj.cable_settings
+        if not cable_settings._get_child(obj, "CABLE_EXTRAS"): continue
+        cable_settings._upgrade_legacy_length_calculator()
+        cable_settings.update_length()
+        cable_settings.update_direct_values()
 
 @addon.scene_update_post
 def scene_update_post(scene):
-    global prev_template_ids, prev_material_ids
+    is_updated = data_is_updated()
+    
+    update_cable_proxies(scene)
+    
+    # e.g. parenting/unparenting doesn't change the number of objects
+    if bpy.data.objects.is_updated:
+        child_index_invalidate()
+        length_tables_prune()
+    
+    if is_updated: update_cable_lengths(scene)
+    
+    update_cable_lods(scene, is_updated)
     
     obj = bpy.context.object
     if not obj: return
     cable_settings = obj.cable_settings
     if not cable_settings.get_spline(): return
     
-    cable_settings.propagate_layers_to_children()
+    key = obj.as_pointer()
+    active_changed = (cable_update_state["active"] != key)
+    cable_update_state["active"] = key
+    
+    cable_updated = is_updated and cable_is_updated(obj)
+    
+    # Entering/leaving local view or moving to other layers changes these;
+    # cable updates may add children (e.g. wires, attachments)
+    layers = (tuple(obj.layers), tuple(obj.layers_local_view))
+    if active_changed or cable_updated or (cable_update_state["layers"] != layers):
+        cable_settings.propagate_layers_to_children()
+        cable_update_state["layers"] = layers
+    
+    if not (active_changed or cable_updated): return
     
+    prev_material_ids = cable_update_state["material_ids"].get(key)
     material_ids = cable_settings.wire_material_ids()
-    if prev_material_ids != material_ids:
+    if (prev_material_ids is not None) and (prev_material_ids != material_ids):
         cable_settings.wire_update()
-    prev_material_ids = material_ids
+    cable_update_state["material_ids"][key] = material_ids
     
+    prev_template_ids = cable_update_state["template_ids"].get(key)
     template_ids = cable_settings.attachment_template_ids()
-    if prev_template_ids != template_ids:
+    if (prev_template_ids is not None) and (prev_template_ids != template_ids):
         cable_settings.attachment_update_all()
-    prev_template_ids = template_ids
+    cable_update_state["template_ids"][key] = template_ids
 
 def register():
     addon.register()
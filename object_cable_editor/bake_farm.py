@@ -0,0 +1,178 @@
+#  ***** BEGIN GPL LICENSE BLOCK *****
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  ***** END GPL LICENSE BLOCK *****
+
+# <pep8 compliant>
+
+"""
+Converts all cables of a .blend file to meshes using several background
+Blender processes (cable baking is CPU-bound and independent per cable).
+
+Usage:
+    blender -b scene.blend -P bake_farm.py -- [--jobs N] [--selected] [--output baked.blend]
+
+The parent process saves a copy of the file, splits the cables between
+N worker processes (each runs the cable_to_mesh pipeline on its share and
+writes the resulting meshes as .npz arrays into a temporary directory),
+then replaces the cables with the baked meshes and saves the result
+(by default, next to the original file with a "_baked" suffix).
+"""
+
+import bpy
+import addon_utils
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import shutil
+import subprocess
+import importlib
+
+import numpy as np
+
+addon_dir = os.path.dirname(os.path.abspath(__file__))
+addon_name = os.path.basename(addon_dir)
+
+def load_addon():
+    addons_dir = os.path.dirname(addon_dir)
+    if addons_dir not in sys.path: sys.path.append(addons_dir)
+    module = addon_utils.enable(addon_name, default_set=False)
+    return module or importlib.import_module(addon_name)
+
+def parse_args(argv):
+    argv = (argv[argv.index("--")+1:] if "--" in argv else [])
+    parser = argparse.ArgumentParser(prog="bake_farm.py", description="Convert cables to meshes in parallel")
+    parser.add_argument("--jobs", type=int, default=(os.cpu_count() or 1), help="number of worker processes")
+    parser.add_argument("--selected", action="store_true", help="convert only selected cables")
+    parser.add_argument("--output", default="", help="path of the resulting .blend file")
+    parser.add_argument("--worker", default="", help=argparse.SUPPRESS) # job file (internal)
+    return parser.parse_args(argv)
+
+def result_path(dirpath, index):
+    return os.path.join(dirpath, "cable_{}.npz".format(index))
+
+def bake_worker(addon, job_path):
+    with open(job_path, "r") as f:
+        job = json.load(f)
+    
+    scene = bpy.context.scene
+    for index, name in job["cables"]:
+        obj = scene.objects.get(name)
+        if not (obj and obj.cable_settings.get_obj_curve()): continue
+        
+        converter = addon.CableMeshConverter(scene, obj)
+        converter.update()
+        res_obj = converter.finish()
+        
+        mesh = res_obj.data
+        arrays = addon.BlUtil.Mesh.to_arrays(mesh)
+        materials = [(material.name if material else "") for material in mesh.materials]
+        np.savez(result_path(job["dirpath"], index), matrix=np.array(res_obj.matrix_world),
+            materials=np.array(materials, dtype=str), **arrays)
+
+def merge_result(addon, scene, name, path):
+    obj = scene.objects.get(name)
+    if not obj: return None # e.g. deleted along with a parent cable
+    
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files}
+    
+    mesh = bpy.data.meshes.new(name)
+    addon.BlUtil.Mesh.from_arrays(mesh, arrays)
+    for material_name in arrays["materials"]:
+        mesh.materials.append(bpy.data.materials.get(str(material_name)))
+    
+    res_obj = bpy.data.objects.new(name, mesh)
+    res_obj.matrix_world = [tuple(row) for row in arrays["matrix"]]
+    
+    addon.delete_hierarchy(scene, obj)
+    
+    scene.objects.link(res_obj)
+    res_obj.name = name
+    mesh.name = name
+    return res_obj
+
+def bake_farm(addon, jobs, selected=False, output=""):
+    scene = bpy.context.scene
+    
+    cables = list(addon.iter_cables(scene))
+    if selected: cables = [obj for obj in cables if obj.select]
+    names = [obj.name for obj in cables]
+    if not names:
+        print("No cables to convert")
+        return
+    
+    jobs = max(min(jobs, len(names)), 1)
+    
+    src_path = bpy.data.filepath
+    if not output:
+        output = os.path.splitext(src_path or os.path.join(tempfile.gettempdir(), "cables"))[0] + "_baked.blend"
+    
+    time_start = time.perf_counter()
+    
+    dirpath = tempfile.mkdtemp(prefix="cable_bake_")
+    try:
+        # Workers load the current state, not the (possibly outdated) file on disk
+        blend_path = os.path.join(dirpath, "source.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+        
+        processes = []
+        for job_id in range(jobs):
+            job_path = os.path.join(dirpath, "job_{}.json".format(job_id))
+            job_cables = [(index, name) for index, name in enumerate(names) if index % jobs == job_id]
+            with open(job_path, "w") as f:
+                json.dump(dict(dirpath=dirpath, cables=job_cables), f)
+            
+            # Without --python-exit-code, an exception in the script still exits with 0
+            args = [bpy.app.binary_path, "-b", blend_path, "--python-exit-code", "1",
+                "-P", os.path.abspath(__file__), "--", "--worker", job_path]
+            processes.append(subprocess.Popen(args))
+        
+        failed = [job_id for job_id, process in enumerate(processes) if process.wait() != 0]
+        missing = [name for index, name in enumerate(names) if not os.path.exists(result_path(dirpath, index))]
+        if failed or missing:
+            # Don't save a file where some of the cables are silently left unbaked
+            raise RuntimeError("Worker processes failed: {}; cables without results: {}".format(failed, missing))
+        
+        time_baked = time.perf_counter()
+        
+        count = 0
+        for index, name in enumerate(names):
+            if merge_result(addon, scene, name, result_path(dirpath, index)): count += 1
+        
+        addon.wire_profile_cache.evict()
+        
+        print("Converted {} of {} cables ({} jobs): bake {:.3f} s, merge {:.3f} s".format(
+            count, len(names), jobs, time_baked - time_start, time.perf_counter() - time_baked))
+    finally:
+        shutil.rmtree(dirpath, ignore_errors=True)
+    
+    bpy.ops.wm.save_as_mainfile(filepath=output)
+    print("Saved {}".format(output))
+
+def main():
+    args = parse_args(sys.argv)
+    addon = load_addon()
+    if args.worker:
+        bake_worker(addon, args.worker)
+    else:
+        bake_farm(addon, args.jobs, args.selected, args.output)
+
+if __name__ == "__main__":
+    main()
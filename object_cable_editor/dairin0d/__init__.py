@@ -37,6 +37,8 @@ try:
     from . import version
     from . import utils_python
     from . import utils_math
+    from . import utils_curve
+    from . import utils_meshio
     from . import utils_text
     from . import utils_accumulation
     from . import utils_gl
@@ -20,6 +20,9 @@ import bpy
 import bmesh
 
 import time
+import collections
+
+import numpy as np
 
 import mathutils
 from mathutils import Color, Vector, Euler, Quaternion, Matrix
@@ -62,37 +65,161 @@ class ToggleObjectMode:
 
 # =============================== MESH CACHE =============================== #
 #============================================================================#
+class ObjectRevisions:
+    """
+    Per-object revision numbers, bumped when the object (or its data)
+    is tagged as updated in scene_update_post. Revisions are reset
+    on undo/file load (bpy.data pointer changes).
+    Revisions are only known while an addon that called track() is
+    registered; otherwise get() returns None (nothing can be reused).
+    """
+    
+    trackers = 0
+    undo_hash = None
+    counter = 0
+    revisions = {} # object pointer: revision
+    suppressed = set() # objects changed (and restored) by the cache itself
+    alive = set() # pointers of existing objects (as of the last update)
+    alive_generation = 0
+    
+    @classmethod
+    def track(cls, addon):
+        # The handler is registered/removed along with the addon
+        addon.scene_update_post(cls.update)
+        addon.on_register(cls._tracker_add)
+        addon.on_unregister(cls._tracker_remove)
+    
+    @classmethod
+    def _tracker_add(cls):
+        cls.trackers += 1
+    
+    @classmethod
+    def _tracker_remove(cls):
+        cls.trackers = max(cls.trackers - 1, 0)
+        if cls.trackers == 0:
+            cls.undo_hash = None
+            cls.revisions.clear()
+            cls.suppressed.clear()
+    
+    data_collections = ("objects", "meshes", "curves", "metaballs", "lattices", "armatures", "fonts")
+    
+    @classmethod
+    def update(cls, scene):
+        undo_hash = bpy.data.as_pointer()
+        if cls.undo_hash != undo_hash:
+            cls.undo_hash = undo_hash
+            cls.revisions.clear()
+            cls.suppressed.clear()
+        
+        if not any(getattr(bpy.data, name).is_updated for name in cls.data_collections): return
+        
+        if bpy.data.objects.is_updated: # objects may have been added/removed
+            alive = {obj.as_pointer() for obj in bpy.data.objects}
+            if alive != cls.alive:
+                for pointer in tuple(cls.revisions.keys()):
+                    if pointer not in alive: del cls.revisions[pointer]
+                cls.suppressed &= alive
+                cls.alive = alive
+                cls.alive_generation += 1
+        
+        for obj in scene.objects:
+            if obj.is_updated or obj.is_updated_data:
+                pointer = obj.as_pointer()
+                if pointer in cls.suppressed:
+                    cls.suppressed.discard(pointer)
+                    continue
+                cls.counter += 1
+                cls.revisions[pointer] = cls.counter
+    
+    @classmethod
+    def suppress(cls, obj):
+        "Don't count the next update of the object (e.g. a temporarily changed setting)"
+        cls.suppressed.add(obj.as_pointer())
+    
+    @classmethod
+    def get(cls, obj):
+        if cls.trackers == 0: return None
+        # A new object can reuse the address of a deleted one before
+        # the next update, so the revision also includes its identity
+        identity = (obj.name, obj.type, (obj.data.as_pointer() if obj.data else 0))
+        return (cls.undo_hash, cls.revisions.get(obj.as_pointer(), 0), identity)
+
+def register_objects(scene, objs):
+    # Make Blender recognize objects as having geometry:
+    # link them to the scene, update it once, then unlink
+    objs = [obj for obj in objs if obj.name not in scene.objects]
+    if not objs: return
+    scene_objects = scene.objects
+    for obj in objs:
+        scene_objects.link(obj)
+    scene.update()
+    for obj in objs:
+        scene_objects.unlink(obj)
+
 class MeshCacheItem:
+    # Rough estimates of Blender's per-element memory usage
+    # (MVert + MEdge + MLoop + MPoly, assuming mostly quads)
+    vertex_size = 20
+    face_size = 4 * (12 + 8) + 12
+    
     def __init__(self):
         self.variants = {}
+        self.memory = 0
     
     def __getitem__(self, variant):
         return self.variants[variant][0]
     
     def __setitem__(self, variant, conversion):
-        obj, converted = conversion
+        obj, converted, revision = conversion
         mesh = obj.data
         #mesh.update(calc_tessface=True)
         #mesh.calc_tessface()
         mesh.calc_normals()
         
-        self.variants[variant] = (obj, converted, mesh)
+        # Meshes of the original objects aren't owned by the cache
+        vertex_count = (len(mesh.vertices) if converted else 0)
+        face_count = (len(mesh.polygons) if converted else 0)
+        
+        self.discard(variant)
+        self.variants[variant] = (obj, converted, mesh, vertex_count, face_count, revision)
+        self.memory += vertex_count * self.vertex_size + face_count * self.face_size
     
     def __contains__(self, variant):
         return variant in self.variants
     
+    vertex_count = property(lambda self: sum(info[3] for info in self.variants.values()))
+    face_count = property(lambda self: sum(info[4] for info in self.variants.values()))
+    
+    def revision(self, variant):
+        return self.variants[variant][5]
+    
+    def discard(self, variant):
+        info = self.variants.pop(variant, None)
+        if not info: return
+        obj, converted, mesh, vertex_count, face_count, revision = info
+        self.memory -= vertex_count * self.vertex_size + face_count * self.face_size
+        if not converted: return
+        if obj and obj.name: bpy.data.objects.remove(obj)
+        if mesh and mesh.name: bpy.data.meshes.remove(mesh)
+    
     def dispose(self):
-        for obj, converted, mesh in self.variants.values():
-            if not converted: continue
-            if obj and obj.name: bpy.data.objects.remove(obj)
-            if mesh and mesh.name: bpy.data.meshes.remove(mesh)
+        for variant in tuple(self.variants.keys()):
+            self.discard(variant)
         self.variants = None
+        self.memory = 0
 
 class MeshCache:
     """
     Keeps a cache of mesh equivalents of requested objects.
-    It is assumed that object's data does not change while
-    the cache is in use.
+    Variants are reconverted when the object was updated since
+    their conversion (see ObjectRevisions).
+    If memory_budget (in bytes) is specified, least recently
+    used objects are evicted when converted meshes exceed it.
+    Temporary objects have to be evaluated in the scene before
+    they can be used for e.g. raycasting. registration can be
+    'IMMEDIATE' (a scene update per conversion), 'DEFERRED'
+    (one scene update for all conversions when register() is
+    called) or 'NONE' (if only mesh data is needed).
     """
     
     variants_enum = {'RAW', 'PREVIEW', 'RENDER'}
@@ -112,15 +239,29 @@ class MeshCache:
     conversible_types = {'MESH', 'CURVE', 'SURFACE', 'FONT',
                          'META', 'ARMATURE', 'LATTICE'}
     
-    def __init__(self, scene, convert_types=None):
+    def __init__(self, scene, convert_types=None, memory_budget=None, registration='IMMEDIATE'):
         self.scene = scene
         self.convert_types = convert_types or self.conversible_types
-        self.cached = {}
+        self.memory_budget = memory_budget
+        self.registration = registration
+        self.pending = [] # temporary objects that aren't registered yet
+        self.cached = collections.OrderedDict() # in the order of use
+        self.memory = 0
+        self.reset_stats()
     
     def __del__(self):
         self.clear()
     
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    stats = property(lambda self: dict(hits=self.hits, misses=self.misses, evictions=self.evictions,
+        memory=self.memory, objects=len(self.cached)))
+    
     def clear(self, expect_zero_users=False):
+        self.pending = []
         for cache_item in self.cached.values():
             if not cache_item: continue
             try:
@@ -128,10 +269,36 @@ class MeshCache:
             except RuntimeError:
                 if expect_zero_users: raise
         self.cached.clear()
+        self.memory = 0
+    
+    def register(self):
+        "Registers all pending temporary objects with a single scene update"
+        pending = []
+        for obj in self.pending:
+            try:
+                if obj.name: pending.append(obj)
+            except ReferenceError: # already disposed
+                pass
+        self.pending = []
+        register_objects(self.scene, pending)
     
     def __delitem__(self, obj):
         cache_item = self.cached.pop(obj, None)
-        if cache_item: cache_item.dispose()
+        if cache_item:
+            self.memory -= cache_item.memory
+            cache_item.dispose()
+    
+    def evict(self, memory_budget=None, keep=None):
+        "Removes least recently used items until the memory usage fits the budget"
+        if memory_budget is None: memory_budget = self.memory_budget
+        if memory_budget is None: return
+        for obj in tuple(self.cached.keys()):
+            if self.memory <= memory_budget: break
+            if obj is keep: continue
+            cache_item = self.cached[obj]
+            if not cache_item: continue
+            del self[obj]
+            self.evictions += 1
     
     def __contains__(self, obj):
         return obj in self.cached
@@ -151,14 +318,20 @@ class MeshCache:
         
         if obj in self.cached:
             cache_item = self.cached[obj]
-            try:
-                # cache_item is None if object isn't conversible to mesh
-                return (None if (cache_item is None) else cache_item[variant])
-            except KeyError:
-                pass
+            self.cached.move_to_end(obj)
+            # cache_item is None if object isn't conversible to mesh
+            if cache_item is None:
+                self.hits += 1
+                return None
+            revision = ObjectRevisions.get(obj)
+            if (variant in cache_item) and (revision is not None) and (cache_item.revision(variant) == revision):
+                self.hits += 1
+                return cache_item[variant]
         else:
             cache_item = None
         
+        self.misses += 1
+        
         if not ((self.convert_types == 'ALL') or (obj.type in self.convert_types)):
             self.cached[obj] = None
             return None
@@ -168,7 +341,12 @@ class MeshCache:
             self.cached[obj] = cache_item
         
         conversion = self._convert(obj, variant, reuse)
-        cache_item[variant] = conversion
+        memory = cache_item.memory
+        # Conversion reflects the object's state after any updates it caused
+        cache_item[variant] = conversion + (ObjectRevisions.get(obj),)
+        self.memory += cache_item.memory - memory
+        
+        self.evict(keep=obj)
         
         return conversion[0]
     
@@ -206,6 +384,8 @@ class MeshCache:
                 result = (self._to_mesh(obj, variant), True)
                 
                 if variant == 'RENDER':
+                    if (data.resolution_u != resolution_u) or (data.resolution_v != resolution_v):
+                        ObjectRevisions.suppress(obj)
                     data.resolution_u = resolution_u
                     data.resolution_v = resolution_v
                 
@@ -224,6 +404,7 @@ class MeshCache:
                 result = (self._to_mesh(obj, variant), True)
                 
                 if variant == 'RENDER':
+                    if data.resolution != resolution: ObjectRevisions.suppress(obj)
                     data.resolution = resolution
                 
                 return result
@@ -293,19 +474,127 @@ class MeshCache:
             #tmp_obj.dupli_list = src_obj.dupli_list
             tmp_obj.dupli_type = src_obj.dupli_type
         
-        # Make Blender recognize object as having geometry
-        # (is there a simpler way to do this?)
-        self.scene.objects.link(tmp_obj)
-        self.scene.update()
-        # We don't need this object in scene
-        self.scene.objects.unlink(tmp_obj)
+        if self.registration != 'NONE':
+            self.pending.append(tmp_obj)
+            if self.registration == 'IMMEDIATE': self.register()
         
         return tmp_obj
 
+class BoundingBoxCache:
+    """
+    Bounding boxes of objects, recomputed only when the object's
+    matrix_world or data (see ObjectRevisions) changes. The world-space
+    union over a scene is maintained incrementally.
+    """
+    
+    undo_hash = None
+    alive_generation = 0
+    local_items = {} # object pointer: (revision, bbox)
+    world_items = {} # object pointer: (revision, matrix, bbox)
+    unions = {} # (scene pointer, excluded pointers): (object pointers, bbox)
+    
+    @classmethod
+    def validate(cls):
+        if cls.undo_hash != ObjectRevisions.undo_hash:
+            cls.undo_hash = ObjectRevisions.undo_hash
+            cls.clear()
+        if cls.alive_generation != ObjectRevisions.alive_generation:
+            cls.alive_generation = ObjectRevisions.alive_generation
+            alive = ObjectRevisions.alive
+            for items in (cls.local_items, cls.world_items):
+                for pointer in tuple(items.keys()):
+                    if pointer not in alive: del items[pointer]
+    
+    @classmethod
+    def clear(cls):
+        cls.local_items.clear()
+        cls.world_items.clear()
+        cls.unions.clear()
+    
+    @classmethod
+    def local(cls, obj, calc):
+        "Local-space (min, max) of the object (calc is used on cache miss)"
+        cls.validate()
+        revision = (ObjectRevisions.get(obj) if obj.mode != 'EDIT' else None) # edits aren't tracked
+        if revision is None: return calc(obj)
+        pointer = obj.as_pointer()
+        item = cls.local_items.get(pointer)
+        if (not item) or (item[0] != revision):
+            item = (revision, calc(obj))
+            cls.local_items[pointer] = item
+        return (item[1][0].copy(), item[1][1].copy())
+    
+    @classmethod
+    def world(cls, obj, mesh_cache):
+        "World-space (min, max) of the object's geometry as a 2x3 array"
+        return cls._world(obj, mesh_cache)[0]
+    
+    @classmethod
+    def _world(cls, obj, mesh_cache):
+        # Returns (bbox, changed, previous bbox or None if unknown)
+        cls.validate()
+        pointer = obj.as_pointer()
+        revision = (ObjectRevisions.get(obj) if obj.mode != 'EDIT' else None) # edits aren't tracked
+        matrix = obj.matrix_world
+        item = cls.world_items.get(pointer)
+        if item and (revision is not None) and (item[0] == revision) and (item[1] == matrix):
+            return item[2], False, item[2]
+        bbox = BlUtil.Object.geometry_bbox(obj, matrix, mesh_cache)
+        cls.world_items[pointer] = (revision, matrix.copy(), bbox)
+        return bbox, True, (item[2] if item else None)
+    
+    @classmethod
+    def scene(cls, scene, mesh_cache, exclude=()):
+        "World-space union of the scene objects' boxes, as (min, max) Vectors"
+        cls.validate()
+        
+        key = (scene.as_pointer(), frozenset(obj.as_pointer() for obj in exclude if obj))
+        pointers, union = cls.unions.get(key, (None, None))
+        
+        # The union only has to be recalculated from scratch when a box
+        # that touched its boundary shrinks, moves or is removed
+        recalc = (pointers is None)
+        def touches_boundary(bbox):
+            return (union is None) or (bbox[0] <= union[0]).any() or (bbox[1] >= union[1]).any()
+        
+        bboxes = []
+        added = []
+        new_pointers = set()
+        for obj in scene.objects:
+            if obj in exclude: continue
+            pointer = obj.as_pointer()
+            new_pointers.add(pointer)
+            bbox, changed, old_bbox = cls._world(obj, mesh_cache)
+            bboxes.append(bbox)
+            if recalc: continue
+            if pointer not in pointers:
+                added.append(bbox)
+            elif changed:
+                if (old_bbox is None) or touches_boundary(old_bbox): recalc = True
+                added.append(bbox)
+        
+        for pointer in (pointers or set()) - new_pointers:
+            item = cls.world_items.pop(pointer, None)
+            if (not item) or touches_boundary(item[2]): recalc = True
+        
+        def merge(boxes):
+            return np.array((np.min([b[0] for b in boxes], axis=0), np.max([b[1] for b in boxes], axis=0)))
+        
+        if recalc:
+            union = (merge(bboxes) if bboxes else None)
+        elif added:
+            if union is not None: added.append(union)
+            union = merge(added)
+        
+        cls.unions[key] = (new_pointers, union)
+        
+        if union is None: return (None, None)
+        return (Vector(union[0]), Vector(union[1]))
+
 # =============================== MESH BAKER =============================== #
 #============================================================================#
 class MeshBaker:
-    def __init__(self, scene, include=None, exclude=None, obj_types=None, edit=False, selection=True, geometry='DEFAULT', origins='DEFAULT', bbox='NONE', dupli=True, solid_only=False, matrix=None, auto_clear=False, collect_materials=False, remove_doubles=None):
+    def __init__(self, scene, include=None, exclude=None, obj_types=None, edit=False, selection=True, geometry='DEFAULT', origins='DEFAULT', bbox='NONE', dupli=True, solid_only=False, matrix=None, auto_clear=False, collect_materials=False, remove_doubles=None, sink=None):
         self.scene = scene
         self.mode = BlEnums.mode_from_object(scene.objects.active)
         self.edit = edit # whether to add object geometry in editmode
@@ -320,7 +609,10 @@ class MeshBaker:
         self.auto_clear = auto_clear
         self.collect_materials = collect_materials
         self.remove_doubles = remove_doubles
-        self.bm = bmesh.new()
+        self.sink = sink # if specified, geometry is passed to sink.write(arrays, materials) instead of the result mesh
+        self._chunks = [] # geometry arrays of the merged objects
+        self._counts = [0, 0, 0, 0] # verts, edges, loops, faces
+        self._scratch = None # intermediate mesh for extracting arrays
         self._mesh = None
         self._obj = None
         self._vert_to_obj = []
@@ -344,7 +636,13 @@ class MeshBaker:
         if self._mesh: return self._mesh
         if self.counter < len(self.objects): return None
         self._mesh = bpy.data.meshes.new("BakedMesh")
-        self.bm.to_mesh(self._mesh)
+        self._chunks_to_mesh(self._mesh)
+        if isinstance(self.remove_doubles, (float, int)): # this will invalidate indices
+            bm = bmesh.new()
+            bm.from_mesh(self._mesh)
+            bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=self.remove_doubles)
+            bm.to_mesh(self._mesh)
+            bm.free()
         #self._mesh.update(calc_tessface=True) # calc_tessface() # is this necessary?
         if self._materials_list:
             materials = self._mesh.materials
@@ -352,19 +650,22 @@ class MeshBaker:
                 materials.append(material)
         return self._mesh
     
-    def object(self, mode='UNLINK'):
+    def object(self, mode='UNLINK', update=True):
+        # update=False skips the scene update that makes Blender evaluate
+        # the object's geometry (e.g. when it's only needed in the scene
+        # or only its mesh data is used)
         if self._obj: return self._obj
         if self.counter < len(self.objects): return None
         self._obj = bpy.data.objects.new("BakedObject", self.mesh())
         self._obj.matrix_world = self.matrix
-        # Make Blender recognize object as having geometry
-        self.scene.objects.link(self._obj)
-        self.scene.update()
         obj = self._obj # save reference in case mode == 'FORGET'
         if mode == 'UNLINK':
             # We don't need this object in scene
-            self.scene.objects.unlink(self._obj)
-        elif mode == 'HIDE':
+            if update: register_objects(self.scene, [self._obj])
+        else:
+            self.scene.objects.link(self._obj)
+            if update: self.scene.update()
+        if mode == 'HIDE':
             self._obj.hide = True
         elif mode == 'FORGET':
             self.forget_results()
@@ -427,7 +728,8 @@ class MeshBaker:
             bpy.data.meshes.remove(self._mesh)
         self._mesh = None
         
-        self._delete_bm()
+        self._chunks = []
+        self._delete_scratch()
     
     def update(self, dt=None):
         use_dt = (dt is not None)
@@ -441,48 +743,49 @@ class MeshBaker:
             if use_dt and (time.clock() > time_stop): return
     
     def _on_finish(self):
-        if isinstance(self.remove_doubles, (float, int)): # this will invalidate indices
-            bmesh.ops.remove_doubles(self.bm, verts=self.bm.verts, dist=self.remove_doubles)
-        else:
-            self.bm.verts.index_update()
-            self.bm.edges.index_update()
-            self.bm.faces.index_update()
+        self._delete_scratch()
     
-    def _delete_bm(self):
-        if self.bm and self.bm.is_valid:
-            self.bm.free()
-        self.bm = None
+    def _delete_scratch(self):
+        if self._scratch and self._scratch.name:
+            bpy.data.meshes.remove(self._scratch)
+        self._scratch = None
     
     def __del__(self):
         if self.auto_clear: self.cleanup()
     
-    def _merge(self, bm_copy):
-        # As of 2.75, the "dest" argument does not work yet
-        #geom = bm_copy.verts[:] + bm_copy.edges[:] + bm_copy.faces[:]
-        #bmesh.ops.duplicate(bm_copy, geom=geom, dest=self.bm, use_select_history=False)
-        
-        # BMesh elements' copy_from() doesn't seem to work on other-mesh elements as well
-        
-        verts_map = {}
-        for vS in bm_copy.verts:
-            vD = self.bm.verts.new(Vector(vS.co))
-            vD.normal = Vector(vS.normal)
-            verts_map[vS] = vD
-        for eS in bm_copy.edges:
-            try:
-                eD = self.bm.edges.new(tuple(verts_map[vS] for vS in eS.verts))
-            except ValueError: # edge already exists
-                continue
-            eD.seam = eS.seam
-            eD.smooth = eS.smooth
-        for fS in bm_copy.faces:
-            try:
-                fD = self.bm.faces.new(tuple(verts_map[vS] for vS in fS.verts))
-            except ValueError: # face already exists
-                continue
-            fD.normal = Vector(fS.normal)
-            fD.material_index = fS.material_index
-            fD.smooth = fS.smooth
+    # index attribute: offset id (verts, edges, loops, faces)
+    _chunk_offsets = {"vertices":0, "vertex_index":0, "edge_index":1, "loop_start":2}
+    
+    def _merge(self, bm_copy, material_id_map=None, default_material_id=None):
+        # Instead of copying elements one by one into an accumulating bmesh,
+        # geometry is extracted as arrays (indices offset by the geometry
+        # merged so far) and written into the result mesh all at once
+        if not self._scratch: self._scratch = bpy.data.meshes.new("BakedMeshScratch")
+        mesh = self._scratch
+        bm_copy.to_mesh(mesh)
+        
+        chunk = BlUtil.Mesh.to_arrays(mesh)
+        for name, offset_id in self._chunk_offsets.items():
+            chunk[name] += self._counts[offset_id]
+        
+        material_index = chunk["material_index"]
+        if material_id_map and (len(material_index) > 0):
+            lut = np.full(max(max(material_id_map), int(material_index.max())) + 1, default_material_id, np.int32)
+            lut[list(material_id_map.keys())] = list(material_id_map.values())
+            chunk["material_index"] = lut[material_index]
+        
+        if self.sink:
+            self.sink.write(chunk, self._materials_list)
+        else:
+            self._chunks.append(chunk)
+        for i, count in enumerate(BlUtil.Mesh.array_counts(chunk)):
+            self._counts[i] += count
+    
+    def _chunks_to_mesh(self, mesh):
+        if not self._chunks: return
+        arrays = {name: np.concatenate([chunk[name] for chunk in self._chunks]) for name in self._chunks[0]}
+        self._chunks = []
+        BlUtil.Mesh.from_arrays(mesh, arrays)
     
     def _to_mesh(self, obj, force_objectmode=False):
         force_objectmode |= self.collect_materials
@@ -640,12 +943,8 @@ class MeshBaker:
             if add_bbox: self._add_bbox(bm_copy, bbox_mode, bbox, matrix)
             
             if len(verts) > 0:
-                if material_id_map:
-                    for face in bm_copy.faces:
-                        face.material_index = material_id_map.get(face.material_index, default_material_id)
-                
                 bm_copy.transform(matrix)
-                self._merge(bm_copy)
+                self._merge(bm_copy, material_id_map, default_material_id)
             
             bm_copy.free()
         
@@ -731,17 +1030,13 @@ class MeshBaker:
     def _add_obj(self, obj):
         if not (obj and obj.name): return
         
-        nv0 = len(self.bm.verts)
-        ne0 = len(self.bm.edges)
-        nf0 = len(self.bm.faces)
+        nv0, ne0, nl0, nf0 = self._counts
         
         vert_offsets = []
         edge_offsets = []
         bbox = self._add_sub_obj(obj, obj.matrix_world, vert_offsets, edge_offsets)
         
-        nv1 = len(self.bm.verts)
-        ne1 = len(self.bm.edges)
-        nf1 = len(self.bm.faces)
+        nv1, ne1, nl1, nf1 = self._counts
         
         if nv1 == nv0: return
         
@@ -1818,6 +2113,20 @@ class ChangeMonitor:
 
 # ============================= BLENDER UTILS ============================== #
 #============================================================================#
+def points_bbox(points, matrix=None):
+    "(min, max) of the (optionally transformed) points as a 2x3 array"
+    points = np.asarray(points).reshape(-1, 3)
+    if matrix is not None:
+        m = np.array(matrix, dtype=np.float64)
+        points = points.dot(m[:3, :3].T) + m[:3, 3]
+    return np.array((points.min(axis=0), points.max(axis=0)))
+
+def bbox_union(bboxes):
+    bboxes = [bbox for bbox in bboxes if bbox is not None]
+    if not bboxes: return (None, None)
+    bboxes = np.array(bboxes)
+    return (Vector(bboxes[:, 0].min(axis=0)), Vector(bboxes[:, 1].max(axis=0)))
+
 class BlUtil:
     class Object:
         @staticmethod
@@ -2043,8 +2352,39 @@ class BlUtil:
                     _bone = bone.bone #data.bones[bone.name] # equivalent
                     yield (bone, (_bone.select, _bone.select_head, _bone.select_tail))
         
+        # Object types whose bound_box (in local space) is exact without modifiers
+        bound_box_types = {'MESH', 'CURVE', 'SURFACE', 'FONT'}
+        
+        @staticmethod
+        def geometry_bbox(obj, matrix, mesh_cache):
+            # (min, max) of the object's geometry transformed by matrix
+            if (obj.type in BlUtil.Object.bound_box_types) and (obj.mode != 'EDIT') and (not obj.modifiers):
+                # The corners of the local box are enough (no need to convert the object)
+                return points_bbox([tuple(corner) for corner in obj.bound_box], matrix)
+            
+            bboxes = []
+            
+            mesh_obj = mesh_cache.get(obj)
+            if mesh_obj and mesh_obj.data.vertices:
+                bboxes.append(points_bbox(BlUtil.Mesh.coords(mesh_obj.data), matrix))
+            else:
+                bboxes.append(points_bbox((0, 0, 0), matrix))
+            
+            if obj.mode == 'EDIT':
+                mesh_obj = mesh_cache.get(obj, 'RAW')
+                if mesh_obj and mesh_obj.data.vertices:
+                    bboxes.append(points_bbox(BlUtil.Mesh.coords(mesh_obj.data), matrix))
+            
+            bboxes = np.array(bboxes)
+            return np.array((bboxes[:, 0].min(axis=0), bboxes[:, 1].max(axis=0)))
+        
         @staticmethod
         def bounding_box(obj):
+            # Cached until the object's data changes (see BoundingBoxCache)
+            return BoundingBoxCache.local(obj, BlUtil.Object.calc_bounding_box)
+        
+        @staticmethod
+        def calc_bounding_box(obj):
             def bbox_add(bbox, p):
                 b0, b1 = bbox
                 if b0:
@@ -2182,44 +2522,24 @@ class BlUtil:
         
         @staticmethod
         def bounding_box(scene, matrix=None, exclude=()):
-            if matrix is None: matrix = Matrix()
+            exclude = {(scene.objects.get(obj) if isinstance(obj, str) else obj) for obj in exclude}
             
-            m_to = matrix_inverted_safe(matrix)
-            points = []
+            mesh_cache = MeshCache(scene, memory_budget=0, registration='NONE') # don't waste memory
             
-            exclude = {(scene.objects.get(obj) if isinstance(obj, str) else obj) for obj in exclude}
+            if matrix is None:
+                # World-space boxes are cached (see BoundingBoxCache)
+                bbox = BoundingBoxCache.scene(scene, mesh_cache, exclude)
+            else:
+                m_to = matrix_inverted_safe(matrix)
+                bboxes = []
+                for obj in scene.objects:
+                    if obj in exclude: continue
+                    bboxes.append(BlUtil.Object.geometry_bbox(obj, m_to * obj.matrix_world, mesh_cache))
+                bbox = bbox_union(bboxes)
             
-            mesh_cache = MeshCache(scene)
-            for obj in scene.objects:
-                if obj in exclude: continue
-                
-                m = m_to * obj.matrix_world
-                
-                mesh_obj = mesh_cache.get(obj)
-                if mesh_obj and mesh_obj.data.vertices:
-                    points.extend(m * v.co for v in mesh_obj.data.vertices)
-                else:
-                    points.append(m * Vector())
-                
-                if obj.mode == 'EDIT':
-                    mesh_obj = mesh_cache.get(obj, 'RAW')
-                    if mesh_obj and mesh_obj.data.vertices:
-                        points.extend(m * v.co for v in mesh_obj.data.vertices)
-                
-                mesh_cache.clear() # don't waste memory
-            
-            if not points: return (None, None) # maybe use numpy? (if 2.70 has it included)
-            points_iter = iter(points)
-            x0, y0, z0 = next(points_iter)
-            x1, y1, z1 = x0, y0, z0
-            for x, y, z in points_iter:
-                x0 = min(x0, x)
-                y0 = min(y0, y)
-                z0 = min(z0, z)
-                x1 = max(x1, x)
-                y1 = max(y1, y)
-                z1 = max(z1, z)
-            return (Vector((x0, y0, z0)), Vector((x1, y1, z1)))
+            mesh_cache.clear()
+            
+            return bbox
     
     class Selection:
         @staticmethod
@@ -2228,6 +2548,7 @@ class BlUtil:
             mode = context.mode
             m_to = matrix_inverted_safe(matrix)
             points = []
+            bboxes = []
             
             if (mode in BlEnums.paint_sculpt_modes) or (mode in {'EDIT_TEXT'}):
                 pass
@@ -2257,28 +2578,13 @@ class BlUtil:
                     for item, select_names in Selection(context):
                         points.append(m * item.co_deform)
             else: # OBJECT, POSE
-                mesh_cache = MeshCache(context.scene)
+                mesh_cache = MeshCache(context.scene, memory_budget=0, registration='NONE') # don't waste memory
                 for obj, select_names in Selection(context):
-                    m = m_to * obj.matrix_world
-                    mesh_obj = mesh_cache.get(obj)
-                    if mesh_obj and mesh_obj.data.vertices:
-                        points.extend(m * v.co for v in mesh_obj.data.vertices)
-                    else:
-                        points.append(m * Vector())
-                    mesh_cache.clear() # don't waste memory
-            
-            if not points: return (None, None) # maybe use numpy? (if 2.70 has it included)
-            points_iter = iter(points)
-            x0, y0, z0 = next(points_iter)
-            x1, y1, z1 = x0, y0, z0
-            for x, y, z in points_iter:
-                x0 = min(x0, x)
-                y0 = min(y0, y)
-                z0 = min(z0, z)
-                x1 = max(x1, x)
-                y1 = max(y1, y)
-                z1 = max(z1, z)
-            return (Vector((x0, y0, z0)), Vector((x1, y1, z1)))
+                    bboxes.append(BlUtil.Object.geometry_bbox(obj, m_to * obj.matrix_world, mesh_cache))
+                mesh_cache.clear()
+            
+            if points: bboxes.append(points_bbox(points))
+            return bbox_union(bboxes)
     
     class Camera:
         @staticmethod
@@ -2372,6 +2678,108 @@ class BlUtil:
             if layer is None: layer = bmlc.new(layer_name)
             elem[layer] = value
     
+    class Mesh:
+        @staticmethod
+        def clear(mesh):
+            bm = bmesh.new()
+            bm.to_mesh(mesh)
+            bm.free()
+        
+        @staticmethod
+        def coords(mesh):
+            # Vertex positions as an Nx3 array
+            co = np.empty(len(mesh.vertices) * 3, np.float32)
+            mesh.vertices.foreach_get("co", co)
+            return co.reshape(-1, 3)
+        
+        # attribute: (collection, dtype, items per element)
+        array_layout = (
+            ("co", ("vertices", np.float32, 3)),
+            ("normal", ("vertices", np.float32, 3)),
+            ("vertices", ("edges", np.int32, 2)),
+            ("use_seam", ("edges", np.bool_, 1)),
+            ("use_edge_sharp", ("edges", np.bool_, 1)),
+            ("vertex_index", ("loops", np.int32, 1)),
+            ("edge_index", ("loops", np.int32, 1)),
+            ("loop_start", ("polygons", np.int32, 1)),
+            ("loop_total", ("polygons", np.int32, 1)),
+            ("material_index", ("polygons", np.int32, 1)),
+            ("use_smooth", ("polygons", np.bool_, 1)),
+        )
+        array_collections = ("vertices", "edges", "loops", "polygons")
+        
+        @staticmethod
+        def array_counts(arrays):
+            # Numbers of vertices, edges, loops and polygons
+            return (len(arrays["co"]) // 3, len(arrays["vertices"]) // 2,
+                len(arrays["vertex_index"]), len(arrays["loop_start"]))
+        
+        @staticmethod
+        def to_arrays(mesh):
+            # Flat arrays of the mesh geometry (see array_layout)
+            counts = [len(getattr(mesh, name)) for name in BlUtil.Mesh.array_collections]
+            arrays = {}
+            for name, (collection_name, dtype, size) in BlUtil.Mesh.array_layout:
+                count = counts[BlUtil.Mesh.array_collections.index(collection_name)]
+                array = np.empty(count * size, dtype)
+                getattr(mesh, collection_name).foreach_get(name, array)
+                arrays[name] = array
+            return arrays
+        
+        @staticmethod
+        def from_arrays(mesh, arrays):
+            # Replaces the mesh geometry with the result of to_arrays()
+            BlUtil.Mesh.clear(mesh)
+            
+            counts = BlUtil.Mesh.array_counts(arrays)
+            for name, count in zip(BlUtil.Mesh.array_collections, counts):
+                if count > 0: getattr(mesh, name).add(count)
+            
+            def set_attribute(name, collection_name):
+                array = np.ascontiguousarray(arrays[name])
+                if len(array) > 0: getattr(mesh, collection_name).foreach_set(name, array)
+            
+            for name, (collection_name, dtype, size) in BlUtil.Mesh.array_layout:
+                if name != "normal": set_attribute(name, collection_name)
+            
+            mesh.update()
+            
+            # mesh.update() recalculates normals (loose vertices have custom ones)
+            set_attribute("normal", "vertices")
+        
+        @staticmethod
+        def from_polygons(mesh, co, loop_totals, loop_vertices=None, smooth=False, material_index=0):
+            # Replaces the mesh geometry in a few foreach_set() calls.
+            # If loop_vertices is None, polygons use consecutive vertices.
+            co = np.asarray(co, dtype=np.float32).reshape(-1, 3)
+            loop_totals = np.asarray(loop_totals, dtype=np.int32).ravel()
+            if loop_vertices is None:
+                loop_vertices = np.arange(len(co), dtype=np.int32)
+            else:
+                loop_vertices = np.asarray(loop_vertices, dtype=np.int32).ravel()
+            loop_starts = np.zeros(len(loop_totals), dtype=np.int32)
+            np.cumsum(loop_totals[:-1], out=loop_starts[1:])
+            
+            n_polygons = len(loop_totals)
+            smooth = np.broadcast_to(np.asarray(smooth, dtype=np.bool_), n_polygons)
+            material_index = np.broadcast_to(np.asarray(material_index, dtype=np.int32), n_polygons)
+            
+            BlUtil.Mesh.clear(mesh)
+            
+            mesh.vertices.add(len(co))
+            mesh.vertices.foreach_set("co", co.ravel())
+            
+            mesh.loops.add(len(loop_vertices))
+            mesh.loops.foreach_set("vertex_index", loop_vertices)
+            
+            mesh.polygons.add(n_polygons)
+            mesh.polygons.foreach_set("loop_start", loop_starts)
+            mesh.polygons.foreach_set("loop_total", loop_totals)
+            mesh.polygons.foreach_set("use_smooth", np.ascontiguousarray(smooth))
+            mesh.polygons.foreach_set("material_index", np.ascontiguousarray(material_index))
+            
+            mesh.update(calc_edges=True)
+    
     class Spline:
         @staticmethod
         def find_point(curve, p):
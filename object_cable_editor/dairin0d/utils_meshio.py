@@ -0,0 +1,173 @@
+#  ***** BEGIN GPL LICENSE BLOCK *****
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  ***** END GPL LICENSE BLOCK *****
+
+import os
+import tempfile
+
+import numpy as np
+
+# Streaming mesh writers: geometry is written chunk by chunk, so memory
+# usage is bounded by the largest chunk rather than the whole export.
+# Chunks are dicts of flat arrays as produced by BlUtil.Mesh.to_arrays()
+# (only "co", "vertex_index", "loop_total" and "material_index" are used;
+# loops are expected to be ordered by polygon). Vertex indices are relative
+# to the current object (see begin_object()).
+
+class MeshWriter:
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.file = open(filepath, "wb")
+        self.vertex_count = 0
+        self.face_count = 0
+        self.vertex_base = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if exc_type is not None:
+            self.abort()
+            return
+        try:
+            self.close()
+        except Exception:
+            self.abort()
+            raise
+    
+    def begin_object(self, name):
+        self.vertex_base = self.vertex_count
+    
+    def write(self, chunk, materials=None):
+        co = np.asarray(chunk["co"], dtype=np.float32)
+        vertex_index = np.asarray(chunk["vertex_index"], dtype=np.int64) + self.vertex_base
+        loop_total = np.asarray(chunk["loop_total"], dtype=np.int64)
+        self._write_verts(co)
+        if len(loop_total) > 0:
+            self._write_faces(vertex_index, loop_total, chunk.get("material_index"), materials)
+        self.vertex_count += len(co) // 3
+        self.face_count += len(loop_total)
+    
+    def close(self):
+        if self.file.closed: return
+        self._finish()
+        self.file.close()
+    
+    def abort(self):
+        # Closes and removes the (incomplete) file
+        self._cleanup()
+        if not self.file.closed: self.file.close()
+        if os.path.exists(self.filepath): os.remove(self.filepath)
+    
+    def _cleanup(self):
+        pass
+    
+    def _write_verts(self, co):
+        pass
+    
+    def _write_faces(self, vertex_index, loop_total, material_index, materials):
+        pass
+    
+    def _finish(self):
+        pass
+
+class PlyWriter(MeshWriter):
+    "Binary little-endian PLY (vertex positions and polygons)"
+    
+    # Counts are unknown until the end, so they are padded to a fixed width
+    _count_width = 12
+    
+    def __init__(self, filepath):
+        MeshWriter.__init__(self, filepath)
+        self._header_counts = []
+        self._write_header()
+        # PLY needs all vertices before faces, so faces are buffered on disk
+        self._faces_file = tempfile.TemporaryFile()
+    
+    def _write_header(self):
+        lines = ["ply", "format binary_little_endian 1.0"]
+        def add_count(text):
+            lines.append(text)
+            # position of the count within the header
+            self._header_counts.append(sum(len(line) + 1 for line in lines) - 1 - self._count_width)
+        add_count("element vertex " + "0" * self._count_width)
+        lines.extend(["property float x", "property float y", "property float z"])
+        add_count("element face " + "0" * self._count_width)
+        # int (not the usual uchar) vertex counts, so that n-gons of any size are valid
+        lines.extend(["property list int int vertex_indices", "end_header"])
+        self.file.write(("\n".join(lines) + "\n").encode("ascii"))
+    
+    def _write_verts(self, co):
+        self.file.write(co.astype("<f4").tobytes())
+    
+    def _write_faces(self, vertex_index, loop_total, material_index, materials):
+        n_faces = len(loop_total)
+        loop_starts = np.zeros(n_faces, dtype=np.int64)
+        np.cumsum(loop_total[:-1], out=loop_starts[1:])
+        
+        # Each face is its vertex count followed by its vertex indices
+        data = np.empty(n_faces + len(vertex_index), dtype="<i4")
+        count_positions = loop_starts + np.arange(n_faces)
+        is_index = np.ones(len(data), dtype=np.bool_)
+        is_index[count_positions] = False
+        data[count_positions] = loop_total
+        data[is_index] = vertex_index
+        self._faces_file.write(data.tobytes())
+    
+    def _finish(self):
+        faces_file = self._faces_file
+        faces_file.seek(0)
+        while True:
+            data = faces_file.read(1 << 24)
+            if not data: break
+            self.file.write(data)
+        faces_file.close()
+        
+        for position, count in zip(self._header_counts, (self.vertex_count, self.face_count)):
+            self.file.seek(position)
+            self.file.write(str(count).zfill(self._count_width).encode("ascii"))
+    
+    def _cleanup(self):
+        self._faces_file.close()
+
+class ObjWriter(MeshWriter):
+    "Wavefront OBJ (vertex positions, polygons grouped by material)"
+    
+    def begin_object(self, name):
+        MeshWriter.begin_object(self, name)
+        self.file.write("o {}\n".format(name).encode("utf-8"))
+    
+    def _write_verts(self, co):
+        np.savetxt(self.file, co.reshape(-1, 3), fmt="v %.6f %.6f %.6f")
+    
+    def _write_faces(self, vertex_index, loop_total, material_index, materials):
+        n_faces = len(loop_total)
+        loop_starts = np.zeros(n_faces, dtype=np.int64)
+        np.cumsum(loop_total[:-1], out=loop_starts[1:])
+        
+        if material_index is None: material_index = np.zeros(n_faces, dtype=np.int32)
+        
+        # Faces of the same material and size are written as one block
+        for material_id in np.unique(material_index):
+            if materials is not None:
+                material = (materials[material_id] if material_id < len(materials) else None)
+                name = (material.name if material else "None")
+                self.file.write("usemtl {}\n".format(name).encode("utf-8"))
+            in_material = (material_index == material_id)
+            for size in np.unique(loop_total[in_material]):
+                faces = np.flatnonzero(in_material & (loop_total == size))
+                indices = vertex_index[loop_starts[faces][:, None] + np.arange(size)] + 1
+                np.savetxt(self.file, indices, fmt="f" + " %d" * int(size))